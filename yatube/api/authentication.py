@@ -0,0 +1,127 @@
+"""Аутентификация по токену с кэшем токенов в памяти процесса.
+
+``TokenAuthentication`` на каждом запросе выбирает токен вместе
+с пользователем. Здесь результат хранится в ограниченном LRU-кэше
+на ``AUTH_TOKEN_CACHE_TIMEOUT`` секунд. Удаление или замена токена
+и отключение пользователя сбрасывают кэш сразу в этом процессе,
+а в остальных процессах — не позже чем через время жизни записи.
+
+Доля попаданий доступна через ``stats()`` и пишется в журнал
+каждые ``AUTH_TOKEN_CACHE_LOG_EVERY`` проверок.
+"""
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from yatube.settings import (AUTH_TOKEN_CACHE_LOG_EVERY,
+                             AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TIMEOUT)
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """LRU-кэш ``ключ токена -> (пользователь, токен)`` с временем жизни."""
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_user(self, user_id):
+        with self._lock:
+            for key, (_, (user, _)) in list(self._entries.items()):
+                if user.pk == user_id:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache(AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TIMEOUT)
+
+
+def stats():
+    return token_cache.stats()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+        self.log_stats()
+        user, token = cached
+        # Пользователь из кэша общий для потоков: запрос получает копию.
+        return copy.copy(user), token
+
+    @staticmethod
+    def log_stats():
+        current = token_cache.stats()
+        lookups = current['hits'] + current['misses']
+        if lookups % AUTH_TOKEN_CACHE_LOG_EVERY == 0:
+            logger.info(
+                'Кэш токенов: %(hits)s попаданий, %(misses)s промахов, '
+                'доля попаданий %(hit_rate).2f, записей %(size)s',
+                current,
+            )
+
+
+# Кэш заполняется только после импорта модуля, поэтому обработчиков,
+# подключённых при импорте, достаточно.
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_changed(sender, instance, **kwargs):
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    if not instance.is_active:
+        token_cache.delete_user(instance.pk)
@@ -1,3 +1,6 @@
+from core.db import serialized
+from core.routers import SAFE_METHODS, replica_reads
+from posts import caching
 from rest_framework.exceptions import PermissionDenied
 
 
@@ -13,3 +16,47 @@ class OnlyAuthor:
             raise PermissionDenied(
                 "У вас нет доступа на удаление/изменение этого ресурса.")
         instance.delete()
+
+
+class ConditionalGet:
+    """Отвечает 304 Not Modified на чтение, пока ресурс не изменился.
+
+    ``etag_scopes`` — области кэша ``posts.caching``, от которых зависит
+    ответ; в них можно подставлять аргументы из URL.
+    """
+    etag_scopes = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        scopes = [scope.format(**kwargs) for scope in self.etag_scopes]
+        etag = caching.etag(
+            request, *scopes, vary=[request.accepted_renderer.format]
+        )
+        return caching.conditional_response(
+            request, etag, lambda: handler(request, *args, **kwargs)
+        )
+
+
+class ReplicaReads:
+    """Безопасные методы читают с реплики базы данных."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class SerializedWrites:
+    """Небезопасные методы встают в очередь транзакций записи."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with serialized():
+            return super().dispatch(request, *args, **kwargs)
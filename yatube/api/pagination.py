@@ -0,0 +1,38 @@
+from posts.utils import KeysetPaginator
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from yatube.settings import COMMENTS_ON_PAGE, PAGINATOR_OBJECTS_ON_PAGE
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная пагинация API с теми же курсорами, что и у страниц сайта.
+
+    Следующая страница запрашивается по ссылке из поля ``next``.
+    """
+    page_size = COMMENTS_ON_PAGE
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.page_size)
+        cursor = request.query_params.get(self.cursor_query_param)
+        after = paginator.decode(cursor) if cursor else None
+        self.page = paginator.page(after=after)
+        return list(self.page)
+
+    def get_next_link(self):
+        if not self.page.has_next():
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.page.next_cursor,
+        )
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+class PostKeysetPagination(KeysetPagination):
+    page_size = PAGINATOR_OBJECTS_ON_PAGE
@@ -1,12 +1,25 @@
-from posts.models import Comment, Group, Post
+from posts import bulk
+from posts.models import Comment, FollowSuggestion, Group, Post
 from rest_framework import serializers
 
 
+class PostListSerializer(serializers.ListSerializer):
+    """Создаёт список постов одним ``bulk_create``."""
+
+    def create(self, validated_data):
+        return bulk.create_posts([Post(**item) for item in validated_data])
+
+
 class PostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
-        fields = ('id', 'text', 'pub_date', 'author', 'image', 'group',)
+        list_serializer_class = PostListSerializer
+        fields = (
+            'id', 'text', 'pub_date', 'author', 'image', 'group',
+            'comments_count',
+        )
+        read_only_fields = ('comments_count',)
 
 
 class GroupSerializer(serializers.ModelSerializer):
@@ -21,3 +34,11 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'author', 'post', 'text', 'pub_date',)
+
+
+class FollowSuggestionSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='author.username')
+
+    class Meta:
+        model = FollowSuggestion
+        fields = ('author', 'username', 'score',)
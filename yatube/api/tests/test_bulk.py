@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from posts import search
+from posts.models import FeedEntry, Follow, Group, Post
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+def matching_post_ids(query, limit=1000):
+    """id постов, в тексте которых или в комментариях к которым есть запрос."""
+    hits, _ = search.search(query, limit)
+    return {hit['post_id'] for hit in hits}
+
+
+class PostBulkApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.follower, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(PostBulkApiTests.author)
+        self.url = '/api/v1/posts/bulk/'
+
+    def test_bulk_create(self):
+        """Пачка постов создаётся с id, счётчиком, лентой и индексом."""
+        payload = [
+            {'text': f'Пакетный пост {i}', 'group': PostBulkApiTests.group.id}
+            for i in range(3)
+        ]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        ids = [item['id'] for item in response.json()]
+        posts = Post.objects.in_bulk(ids)
+        self.assertEqual(
+            [posts[pk].text for pk in ids],
+            [item['text'] for item in payload],
+        )
+        author = User.objects.get(pk=PostBulkApiTests.author.pk)
+        self.assertEqual(author.posts_count, 3)
+        self.assertEqual(
+            FeedEntry.objects.filter(user=PostBulkApiTests.follower).count(),
+            3,
+        )
+        self.assertEqual(matching_post_ids('Пакетный'), set(ids))
+
+    def test_invalid_item_rejects_batch(self):
+        """Ошибки возвращаются по позициям, посты не создаются."""
+        payload = [{'text': 'Хороший пост'}, {'text': ''}]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn('text', errors[1])
+        self.assertFalse(Post.objects.exists())
+
+    def test_bulk_requires_list(self):
+        """Тело запроса должно быть списком."""
+        response = self.client.post(
+            self.url, {'text': 'Один пост'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_fetch_by_ids_in_one_query(self):
+        """?ids= возвращает нужные посты одним запросом."""
+        posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=PostBulkApiTests.author
+            )
+            for i in range(4)
+        ]
+        ids = [posts[0].id, posts[2].id]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                '/api/v1/posts/', {'ids': ','.join(map(str, ids))}
+            )
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            sorted(item['id'] for item in response.json()), ids
+        )
+
+    def test_bad_ids(self):
+        """Некорректный ?ids= отвечает 400."""
+        response = self.client.get('/api/v1/posts/', {'ids': '1,x'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from posts import caching
+from posts.models import Comment, Group, Post
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class ApiConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+        cls.other_post = Post.objects.create(
+            text='Другой пост', author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.posts_url = '/api/v1/posts/'
+        self.comments_url = (
+            f'/api/v1/posts/{ApiConditionalGetTests.post.id}/comments/'
+        )
+
+    def add_comment(self, post):
+        Comment.objects.create(
+            post=post, author=ApiConditionalGetTests.author, text='Комментарий'
+        )
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unchanged_resources_answer_not_modified(self):
+        """Неизменившиеся списки и объекты отвечают 304 без запросов к БД."""
+        post_id = ApiConditionalGetTests.post.id
+        for url in (
+            self.posts_url, f'{self.posts_url}{post_id}/', self.comments_url
+        ):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    self.assertNotModified(url, etag)
+
+    def test_comment_changes_etags(self):
+        """Комментарий меняет ETag списка постов и своих комментариев."""
+        posts_etag = self.client.get(self.posts_url)['ETag']
+        comments_etag = self.client.get(self.comments_url)['ETag']
+        self.add_comment(ApiConditionalGetTests.post)
+        response = self.client.get(
+            self.posts_url, HTTP_IF_NONE_MATCH=posts_etag
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            self.comments_url, HTTP_IF_NONE_MATCH=comments_etag
+        )
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_other_post_comment_keeps_etag(self):
+        """Комментарий к другому посту не сбрасывает валидатор."""
+        etag = self.client.get(self.comments_url)['ETag']
+        self.add_comment(ApiConditionalGetTests.other_post)
+        self.assertNotModified(self.comments_url, etag)
+
+    def test_etag_changes_in_every_process(self):
+        """Запись в одном процессе сбрасывает валидаторы в других."""
+        workers = [LocMemCache('worker-a', {}), LocMemCache('worker-b', {})]
+        with mock.patch.object(caching, 'cache', workers[0]):
+            etag = self.client.get(self.posts_url)['ETag']
+        with mock.patch.object(caching, 'cache', workers[1]):
+            Post.objects.create(
+                text='Новый пост', author=ApiConditionalGetTests.author
+            )
+        with mock.patch.object(caching, 'cache', workers[0]):
+            response = self.client.get(
+                self.posts_url, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_group_deletion_changes_post_list_etag(self):
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.filter(pk=ApiConditionalGetTests.post.pk).update(
+            group=group
+        )
+        etag = self.client.get(self.posts_url)['ETag']
+        group.delete()
+        response = self.client.get(self.posts_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        groups = {post['id']: post['group'] for post in response.json()}
+        self.assertIsNone(groups[ApiConditionalGetTests.post.id])
@@ -0,0 +1,132 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from posts.models import Comment, Group, Post
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class ExportApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}',
+                author=cls.author if i % 2 else cls.other,
+                group=cls.group if i < 3 else None,
+            )
+            for i in range(5)
+        ]
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.posts[1], author=cls.other, text=f'Комментарий {i}'
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = '/api/v1/export/'
+
+    def export(self, params=''):
+        response = self.client.get(self.url + params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_export_posts(self):
+        """Все посты по возрастанию id, в конце строка end."""
+        lines = self.export()
+        self.assertEqual(
+            [line['data']['id'] for line in lines[:-1]],
+            [post.id for post in ExportApiTests.posts],
+        )
+        self.assertEqual(lines[0]['cursor'], lines[0]['data']['id'])
+        self.assertEqual(
+            lines[-1], {'type': 'end', 'cursor': ExportApiTests.posts[-1].id}
+        )
+
+    def test_export_comments(self):
+        """Комментарии идут сразу за своим постом по порядку."""
+        lines = self.export('?comments=1')
+        position = [line.get('cursor') for line in lines].index(
+            ExportApiTests.posts[1].id
+        )
+        self.assertEqual(
+            [line['data']['id'] for line in lines[position + 1:position + 3]],
+            [comment.id for comment in ExportApiTests.comments],
+        )
+        self.assertEqual(
+            sum(line['type'] == 'comment' for line in lines), 2
+        )
+
+    def test_export_filters(self):
+        """Фильтры по группе, автору и дате."""
+        post = ExportApiTests.posts
+        group, author = ExportApiTests.group, ExportApiTests.author
+        lines = self.export(f'?group={group.id}&author={author.id}')
+        self.assertEqual(
+            [line['data']['id'] for line in lines[:-1]], [post[1].id]
+        )
+        self.assertEqual(len(self.export('?since=2999-01-01')), 1)
+        self.assertEqual(len(self.export('?since=2000-01-01T00:00:00')), 6)
+
+    def test_export_resume(self):
+        """Выгрузка продолжается с курсора."""
+        cursor = ExportApiTests.posts[2].id
+        lines = self.export(f'?cursor={cursor}')
+        self.assertEqual(
+            [line['data']['id'] for line in lines[:-1]],
+            [post.id for post in ExportApiTests.posts[3:]],
+        )
+
+    def test_export_queries_per_chunk(self):
+        """На пачку постов по одному запросу к постам и комментариям."""
+        with mock.patch('api.views.API_EXPORT_CHUNK_SIZE', 2), \
+                CaptureQueriesContext(connection) as queries:
+            lines = self.export('?comments=1')
+        self.assertEqual(len(lines), 5 + 2 + 1)
+        # Три пачки постов и пустой запрос в конце.
+        self.assertEqual(len(queries), 3 * 2 + 1)
+
+    def test_export_comments_in_batches(self):
+        """Комментарии поста читаются и отдаются порциями по ключу."""
+        with mock.patch('api.views.API_EXPORT_CHUNK_SIZE', 1), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url + '?comments=1')
+            parts = list(response.streaming_content)
+        lines = [json.loads(line) for line in b''.join(parts).splitlines()]
+        position = [line.get('cursor') for line in lines].index(
+            ExportApiTests.posts[1].id
+        )
+        self.assertEqual(
+            [line['data']['id'] for line in lines[position + 1:position + 3]],
+            [comment.id for comment in ExportApiTests.comments],
+        )
+        self.assertEqual(len(parts), len(lines))
+        comment_queries = [
+            query for query in queries
+            if 'FROM "posts_comment"' in query['sql']
+        ]
+        # У второго поста две порции комментариев, у остальных по одной.
+        self.assertEqual(len(comment_queries), 5 + 1)
+
+    def test_invalid_params(self):
+        for params in ('?since=вчера', '?group=x', '?cursor=x'):
+            with self.subTest(params=params):
+                response = self.client.get(self.url + params)
+                self.assertEqual(response.status_code, 400)
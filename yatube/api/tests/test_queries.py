@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from posts.models import Comment, Group, Post
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+# Допустимое число запросов к БД на запрос к API.
+QUERY_BUDGETS = {
+    'posts-list': 1,
+    'posts-detail': 1,
+    'groups-list': 1,
+    'comments-list': 2,
+    'comments-detail': 2,
+}
+
+
+class ApiQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.author,
+            group=cls.group,
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.post,
+            author=cls.author,
+            text='Тестовый комментарий',
+        )
+
+    @classmethod
+    def create_rows(cls, count):
+        """Добавляет посты и комментарии разных пользователей."""
+        for i in range(count):
+            user = User.objects.create_user(username=f'user_{i}')
+            Post.objects.create(text=f'Пост {i}', author=user, group=cls.group)
+            Comment.objects.create(post=cls.post, author=user, text=f'{i}')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        post_id = ApiQueryBudgetTests.post.id
+        self.urls = {
+            'posts-list': '/api/v1/posts/',
+            'posts-detail': f'/api/v1/posts/{post_id}/',
+            'groups-list': '/api/v1/groups/',
+            'comments-list': f'/api/v1/posts/{post_id}/comments/',
+            'comments-detail':
+                f'/api/v1/posts/{post_id}/comments/'
+                f'{ApiQueryBudgetTests.comment.id}/',
+        }
+
+    def count_queries(self):
+        counts = {}
+        for name, url in self.urls.items():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[name] = len(queries)
+        return counts
+
+    def test_endpoints_fit_query_budget(self):
+        """Запросы к API укладываются в бюджет запросов к БД."""
+        ApiQueryBudgetTests.create_rows(5)
+        for name, count in self.count_queries().items():
+            with self.subTest(endpoint=name):
+                self.assertLessEqual(count, QUERY_BUDGETS[name])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        """Число запросов не зависит от числа строк в ответе."""
+        before = self.count_queries()
+        ApiQueryBudgetTests.create_rows(8)
+        self.assertEqual(self.count_queries(), before)
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from core import shared
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .. import throttling
+
+User = get_user_model()
+
+RATES = {
+    'user': '2/min',
+    'anon': '2/min',
+    'user_write': '1/min',
+    'anon_write': '1/min',
+}
+
+
+@mock.patch.object(throttling.UserRateThrottle, 'THROTTLE_RATES', RATES)
+@mock.patch.object(throttling.AnonRateThrottle, 'THROTTLE_RATES', RATES)
+@mock.patch.object(
+    throttling.UserWriteRateThrottle, 'THROTTLE_RATES', RATES
+)
+@mock.patch.object(
+    throttling.AnonWriteRateThrottle, 'THROTTLE_RATES', RATES
+)
+class ThrottlingApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        shared.connection(
+            throttling.THROTTLE_DATABASE, throttling.SCHEMA_SQL
+        ).execute('DELETE FROM throttle')
+        self.client = APIClient()
+
+    def test_anon_reads_limited(self):
+        for _ in range(2):
+            response = self.client.get('/api/v1/posts/')
+            self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/v1/posts/')
+        self.assertEqual(response.status_code, 429)
+        self.assertLessEqual(int(response['Retry-After']), 60)
+
+    def test_writes_have_own_scope(self):
+        """Запись не расходует лимит чтения и ограничена отдельно."""
+        self.client.force_authenticate(ThrottlingApiTests.user)
+        for _ in range(2):
+            response = self.client.get('/api/v1/posts/')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/posts/').status_code, 429)
+        data = {'text': 'Пост', 'author': ThrottlingApiTests.user.id}
+        self.assertEqual(
+            self.client.post('/api/v1/posts/', data).status_code, 201
+        )
+        self.assertEqual(
+            self.client.post('/api/v1/posts/', data).status_code, 429
+        )
+
+    def test_anon_login_attempts_limited(self):
+        url = '/api/v1/api-token-auth/'
+        data = {'username': 'auth', 'password': 'wrong'}
+        self.assertEqual(self.client.post(url, data).status_code, 400)
+        self.assertEqual(self.client.post(url, data).status_code, 429)
+
+
+class ThrottleStoreTests(TestCase):
+    def test_counter_shared_between_connections(self):
+        """Счётчик окна общий для соединений, новое окно начинается с 1."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'throttle.sqlite3')
+        counts = []
+        with mock.patch.object(throttling, 'THROTTLE_DATABASE', path):
+            counts.append(throttling.hit('client', 1))
+            # Другой поток открывает своё соединение, как другой процесс.
+            thread = threading.Thread(
+                target=lambda: counts.append(throttling.hit('client', 1))
+            )
+            thread.start()
+            thread.join()
+            counts.append(throttling.hit('client', 1))
+            counts.append(throttling.hit('client', 2))
+            shared.connection(path, throttling.SCHEMA_SQL).close()
+            del shared._local.connections[path]
+        self.assertEqual(counts, [1, 2, 3, 1])
@@ -0,0 +1,91 @@
+"""Ограничение частоты запросов API со счётчиками в общем файле SQLite.
+
+Стандартные ограничители DRF хранят в кэше список времени каждого
+запроса клиента. С ``LocMemCache`` у каждого процесса свой список,
+и реальный лимит умножается на число процессов, а список переписывается
+целиком на каждом запросе.
+
+Здесь лимит считается фиксированными окнами: на клиента и область
+одна строка со счётчиком текущего окна в файле ``THROTTLE_DATABASE``,
+общем для процессов на сервере. Счётчик увеличивается одним атомарным
+``INSERT ... ON CONFLICT``. На стыке окон клиент может успеть сделать
+до двух лимитов подряд — это плата за постоянный объём памяти.
+
+Чтение и запись ограничиваются отдельно: ``user`` и ``anon`` считают
+безопасные запросы, ``user_write`` и ``anon_write`` — остальные.
+"""
+import random
+
+from core import shared
+from core.routers import SAFE_METHODS
+from rest_framework import throttling
+from yatube.settings import THROTTLE_DATABASE, THROTTLE_PRUNE_PROBABILITY
+
+SCHEMA_SQL = (
+    'CREATE TABLE IF NOT EXISTS throttle ('
+    'key TEXT PRIMARY KEY, window INTEGER NOT NULL, '
+    'count INTEGER NOT NULL) WITHOUT ROWID'
+)
+
+HIT_SQL = (
+    'INSERT INTO throttle (key, window, count) VALUES (?, ?, 1) '
+    'ON CONFLICT (key) DO UPDATE SET '
+    'count = CASE WHEN window = excluded.window THEN count + 1 ELSE 1 END, '
+    'window = excluded.window '
+    'RETURNING count'
+)
+
+PRUNE_SQL = 'DELETE FROM throttle WHERE window < ?'
+
+
+def hit(key, window):
+    """Учитывает запрос в окне ``window`` и возвращает счётчик окна."""
+    connection = shared.connection(THROTTLE_DATABASE, SCHEMA_SQL)
+    count, = connection.execute(HIT_SQL, [key, window]).fetchone()
+    if random.random() < THROTTLE_PRUNE_PROBABILITY:
+        # Строки клиентов, не приходивших с прошлого окна.
+        connection.execute(PRUNE_SQL, [window - 1])
+    return count
+
+
+class FixedWindowMixin:
+    """Лимит ``num_requests`` за окно ``duration`` секунд.
+
+    Считает безопасные запросы, а при ``safe = False`` — остальные.
+    """
+
+    safe = True
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        if (request.method in SAFE_METHODS) != self.safe:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.window_end = (window + 1) * self.duration
+        return hit(self.key, window) <= self.num_requests
+
+    def wait(self):
+        return max(self.window_end - self.now, 0)
+
+
+class UserRateThrottle(FixedWindowMixin, throttling.UserRateThrottle):
+    pass
+
+
+class AnonRateThrottle(FixedWindowMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserWriteRateThrottle(FixedWindowMixin, throttling.UserRateThrottle):
+    scope = 'user_write'
+    safe = False
+
+
+class AnonWriteRateThrottle(FixedWindowMixin, throttling.AnonRateThrottle):
+    scope = 'anon_write'
+    safe = False
@@ -2,7 +2,7 @@ from django.urls import include, path
 from rest_framework.authtoken import views as authtokenviews
 from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import throttling, views
 
 app_name = 'api'
 
@@ -16,6 +16,15 @@ router.register(
 
 urlpatterns = [
     path('v1/api-token-auth/',
-         authtokenviews.obtain_auth_token, name='api_token_auth'),
+         authtokenviews.ObtainAuthToken.as_view(
+             throttle_classes=[throttling.AnonWriteRateThrottle]
+         ),
+         name='api_token_auth'),
+    path('v1/search/', views.SearchView.as_view(), name='search'),
+    path('v1/export/', views.ExportView.as_view(), name='export'),
+    path(
+        'v1/suggestions/', views.SuggestionsView.as_view(),
+        name='suggestions'
+    ),
     path('v1/', include(router.urls)),
 ]
@@ -1,26 +1,107 @@
+from datetime import datetime, time
+
+from core.routers import replica_reads
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from posts.models import Group, Post
-from rest_framework import viewsets
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from posts import search, suggestions, trending
+from posts.models import Comment, Group, Post
+from posts.utils import KeysetPaginator
+from rest_framework import generics, permissions, status, views, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
+from yatube.settings import (API_BULK_MAX_POSTS, API_EXPORT_CHUNK_SIZE,
+                             PAGINATOR_OBJECTS_ON_PAGE, SUGGESTIONS_TOP_K)
 
-from .mixins import OnlyAuthor
-from .serializers import CommentSerializer, GroupSerializer, PostSerializer
+from .mixins import (ConditionalGet, OnlyAuthor, ReplicaReads,
+                     SerializedWrites)
+from .pagination import KeysetPagination, PostKeysetPagination
+from .serializers import (CommentSerializer, FollowSuggestionSerializer,
+                          GroupSerializer, PostSerializer)
 
 
-class PostViewSet(OnlyAuthor, viewsets.ModelViewSet):
+class PostViewSet(ReplicaReads, SerializedWrites, ConditionalGet, OnlyAuthor,
+                  viewsets.ModelViewSet):
+    etag_scopes = ('all', 'comments')
     queryset = Post.objects.all()
     serializer_class = PostSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        ids = self.request.query_params.get('ids')
+        if ids is not None and self.action == 'list':
+            # По id без сортировки по дате: порядок берётся из ключа,
+            # а не временным деревом сортировки.
+            queryset = queryset.filter(
+                pk__in=self.parse_ids(ids)
+            ).order_by('pk')
+        return queryset
+
+    @staticmethod
+    def parse_ids(value):
+        try:
+            ids = [int(pk) for pk in value.split(',')]
+        except ValueError:
+            raise ValidationError(
+                {'ids': 'Ожидается список id через запятую.'}
+            )
+        if len(ids) > API_BULK_MAX_POSTS:
+            raise ValidationError(
+                {'ids': f'Не больше {API_BULK_MAX_POSTS} id за запрос.'}
+            )
+        return ids
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @action(detail=False, url_path='popular')
+    def popular(self, request):
+        """Популярные посты по рейтингу ``posts.trending``."""
+        paginator = PostKeysetPagination()
+        page = paginator.paginate_queryset(trending.posts(), request, self)
+        serializer = self.get_serializer(trending.as_posts(page), many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """Создаёт список постов одной транзакцией.
+
+        Ошибки валидации возвращаются списком по позициям переданных
+        постов; если хотя бы один пост с ошибкой, не создаётся ни один.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError(
+                {'non_field_errors': ['Ожидается список постов.']}
+            )
+        if len(request.data) > API_BULK_MAX_POSTS:
+            raise ValidationError({'non_field_errors': [
+                f'Не больше {API_BULK_MAX_POSTS} постов за запрос.'
+            ]})
+        data = [
+            {**item, 'author': request.user.pk}
+            if isinstance(item, dict) else item
+            for item in request.data
+        ]
+        serializer = self.get_serializer(data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(author=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
+class GroupViewSet(ReplicaReads, viewsets.ReadOnlyModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
 
 
-class CommentViewSet(OnlyAuthor, viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReads, SerializedWrites, ConditionalGet,
+                     OnlyAuthor, viewsets.ModelViewSet):
+    etag_scopes = ('comments:{post_id}',)
     serializer_class = CommentSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         post = get_object_or_404(Post, pk=self.kwargs.get("post_id"))
@@ -29,3 +110,159 @@ class CommentViewSet(OnlyAuthor, viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(
             author=self.request.user, post_id=self.kwargs.get("post_id"))
+
+
+class SuggestionsView(ReplicaReads, generics.ListAPIView):
+    """Рекомендации подписок текущего пользователя, лучшие первыми."""
+    permission_classes = (permissions.IsAuthenticated,)
+    serializer_class = FollowSuggestionSerializer
+
+    def get_queryset(self):
+        return suggestions.for_user(self.request.user, SUGGESTIONS_TOP_K)
+
+
+class SearchView(ReplicaReads, views.APIView):
+    """Полнотекстовый поиск по постам и комментариям.
+
+    Результаты упорядочены по релевантности, следующая страница
+    запрашивается по курсору из поля ``next``.
+    """
+    def get(self, request):
+        hits, next_cursor = search.search(
+            request.query_params.get('q', ''),
+            PAGINATOR_OBJECTS_ON_PAGE,
+            after=request.query_params.get('cursor'),
+        )
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'cursor', next_cursor
+            )
+        return Response({
+            'next': next_url,
+            'results': [
+                {
+                    'kind': hit['kind'],
+                    'id': hit['object_id'],
+                    'post': hit['post_id'],
+                    'text': hit['text'],
+                }
+                for hit in hits
+            ],
+        })
+
+
+class ExportView(ReplicaReads, views.APIView):
+    """Выгрузка постов, а с ``comments=1`` и комментариев, в NDJSON.
+
+    Посты идут по возрастанию id пачками по ``API_EXPORT_CHUNK_SIZE``,
+    каждая пачка — отдельный запрос по ключу, поэтому память не растёт
+    с размером выгрузки. Фильтры: ``since`` (дата или дата и время),
+    ``group`` и ``author`` (id). Строка поста содержит ``cursor``;
+    оборванную выгрузку продолжают с ``cursor`` последнего полностью
+    полученного поста. Последняя строка — ``{"type": "end"}``.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    def get(self, request):
+        params = request.query_params
+        filters = self.parse_filters(params)
+        after = self.parse_int(params, 'cursor') or 0
+        with_comments = params.get('comments') in ('1', 'true')
+        response = StreamingHttpResponse(
+            self.stream(filters, after, with_comments),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    @staticmethod
+    def parse_int(params, name):
+        value = params.get(name)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: 'Ожидается целое число.'})
+
+    def parse_filters(self, params):
+        filters = {}
+        since = params.get('since')
+        if since is not None:
+            moment = parse_datetime(since)
+            if moment is None:
+                day = parse_date(since)
+                if day is None:
+                    raise ValidationError(
+                        {'since': 'Ожидается дата в формате ISO 8601.'}
+                    )
+                moment = datetime.combine(day, time.min)
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            filters['pub_date__gte'] = moment
+        for name in ('group', 'author'):
+            value = self.parse_int(params, name)
+            if value is not None:
+                filters[f'{name}_id'] = value
+        return filters
+
+    def stream(self, filters, after, with_comments):
+        # Генератор работает уже после выхода из dispatch.
+        with replica_reads():
+            while True:
+                posts = list(
+                    Post.objects.filter(pk__gt=after, **filters)
+                    .order_by('pk')[:API_EXPORT_CHUNK_SIZE]
+                )
+                if not posts:
+                    break
+                yield from self.chunk(posts, with_comments)
+                after = posts[-1].pk
+        yield self.line({'type': 'end', 'cursor': after})
+
+    def chunk(self, posts, with_comments):
+        """Строки пачки постов порциями не больше ``API_EXPORT_CHUNK_SIZE``.
+
+        Комментарии читаются по ключу и идут вслед за своим постом,
+        поэтому пост с десятками тысяч комментариев не держится в памяти.
+        """
+        data = PostSerializer(
+            posts, many=True, context={'request': self.request}
+        ).data
+        comments = self.comments(posts) if with_comments else iter(())
+        comment = next(comments, None)
+        lines = []
+        for item in data:
+            lines.append(self.line(
+                {'type': 'post', 'cursor': item['id'], 'data': item}
+            ))
+            while comment is not None and comment.post_id == item['id']:
+                if len(lines) >= API_EXPORT_CHUNK_SIZE:
+                    yield ''.join(lines)
+                    lines = []
+                value = CommentSerializer(comment).data
+                lines.append(self.line({'type': 'comment', 'data': value}))
+                comment = next(comments, None)
+        if lines:
+            yield ''.join(lines)
+
+    @staticmethod
+    def comments(posts):
+        """Комментарии пачки постов по порядку написания, порциями по ключу."""
+        paginator = KeysetPaginator(
+            Comment.objects.filter(
+                post_id__in=[post.pk for post in posts]
+            ).order_by('post_id', 'pub_date', 'id'),
+            API_EXPORT_CHUNK_SIZE,
+        )
+        page = paginator.page()
+        while True:
+            yield from page
+            if not page.has_next():
+                return
+            last = page[-1]
+            page = paginator.page(after=[last.post_id, last.pub_date, last.id])
+
+    def line(self, value):
+        return self.encoder.encode(value) + '\n'
@@ -0,0 +1,50 @@
+"""Пользователь запроса из кэша вместо выборки из базы.
+
+``AuthenticationMiddleware`` на каждом запросе читает пользователя
+из базы. Здесь пользователь хранится в кэше на ``USER_SNAPSHOT_TIMEOUT``
+секунд, а хэш сессии сверяется с хэшем пароля из снимка, как это делает
+``django.contrib.auth.get_user``: смена пароля завершает старые сессии.
+Сохранение пользователя удаляет снимок. Снимки используются только
+с кэшем, общим для процессов (``CACHE_SHARED``): иначе удаление снимка
+в одном процессе не дошло бы до других.
+"""
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from yatube.settings import USER_SNAPSHOT_TIMEOUT
+
+USER_SNAPSHOT_KEY = 'auth:user:{}'
+
+
+def get_user(request):
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    key = USER_SNAPSHOT_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, USER_SNAPSHOT_TIMEOUT)
+        return user
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not (
+        session_hash
+        and constant_time_compare(session_hash, user.get_session_auth_hash())
+    ):
+        request.session.flush()
+        return AnonymousUser()
+    user.backend = backend
+    return user
+
+
+# Снимки появляются только после импорта модуля middleware,
+# поэтому обработчика, подключённого при импорте, достаточно.
+@receiver(post_save, sender=auth.get_user_model())
+def user_saved(sender, instance, **kwargs):
+    cache.delete(USER_SNAPSHOT_KEY.format(instance.pk))
@@ -0,0 +1,90 @@
+"""Профиль SQLite для продакшена.
+
+``DATABASE_PROFILE=production`` включает WAL, настройки PRAGMA для
+каждого нового соединения, постоянные соединения и очередь записи:
+транзакции записи из view и API по очереди берут блокировку процесса
+и файла, а не соревнуются за блокировку базы. Иначе транзакция SQLite,
+начатая чтением, при записи получает «database is locked» сразу,
+не дожидаясь ``busy_timeout``.
+"""
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from yatube.settings import (SQLITE_PRAGMAS, SQLITE_SERIALIZE_WRITES,
+                             SQLITE_WRITE_LOCK)
+
+from .routers import SAFE_METHODS
+
+try:
+    import fcntl
+except ImportError:
+    # Без fcntl (Windows) запись упорядочена только внутри процесса.
+    fcntl = None
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def write_lock(path=None):
+    """Блокировка записи, общая для потоков и процессов сайта.
+
+    Повторный вход из того же потока не блокирует.
+    """
+    if getattr(_local, 'held', False):
+        yield
+        return
+    with _lock:
+        _local.held = True
+        try:
+            if fcntl is None:
+                yield
+                return
+            with open(path or SQLITE_WRITE_LOCK, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            _local.held = False
+
+
+@contextmanager
+def serialized():
+    """Транзакция записи в очереди за блокировкой ``write_lock``."""
+    if not SQLITE_SERIALIZE_WRITES:
+        yield
+        return
+    with write_lock(), transaction.atomic():
+        yield
+
+
+def serialized_write(all_methods=False):
+    """Декоратор view: запросы с записью выполняются по очереди.
+
+    По умолчанию в очередь встают только небезопасные методы;
+    ``all_methods`` — для view, которые пишут и на GET.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not all_methods and request.method in SAFE_METHODS:
+                return view(request, *args, **kwargs)
+            with serialized():
+                return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,260 @@
+import json
+import math
+import os
+import re
+import time
+from contextlib import ExitStack
+from unittest import mock
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from yatube.settings import BASE_DIR
+
+from api import authentication, throttling
+from posts.models import Comment, Group, Post, User
+
+HTTP_DIR = os.path.join(os.path.dirname(BASE_DIR), 'API_REQUESTS')
+
+# Страницы сайта: имя URL и аргументы из образца данных.
+HTML_VIEWS = (
+    ('posts:index', ()),
+    ('posts:groups', ()),
+    ('posts:group_number', ('slug',)),
+    ('posts:profile', ('username',)),
+    ('posts:post_detail', ('post_id',)),
+    ('posts:follow_index', ()),
+    ('posts:search', ()),
+)
+
+# Какой объект образца подставить вместо pk в маршруте API.
+API_PK = {'post': 'post_id', 'group': 'group_id', 'comment': 'comment_id'}
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def http_requests(directory):
+    """Пути GET-запросов из файлов ``*.http`` в порядке их появления."""
+    paths = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.http'):
+            continue
+        with open(os.path.join(directory, name), encoding='utf-8') as file:
+            for line in file:
+                match = re.match(r'GET\s+(\S+)', line)
+                if match:
+                    url = urlsplit(match.group(1))
+                    path = url.path + (f'?{url.query}' if url.query else '')
+                    if path not in paths:
+                        paths.append(path)
+    return paths
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон: GET-запросы из API_REQUESTS/*.http и страницы '
+        'сайта. Печатает в JSON перцентили задержки, RPS и число '
+        'SQL-запросов для каждого адреса. Ограничение частоты запросов '
+        'API на время прогона отключено; ответ не 2xx — ошибка.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Число замеряемых запросов на адрес.',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Число прогревочных запросов на адрес.',
+        )
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='Запрашивать страницы без входа на сайт.',
+        )
+        parser.add_argument('--http-dir', default=HTTP_DIR)
+        parser.add_argument(
+            '--output', help='Файл для результатов вместо stdout.',
+        )
+        parser.add_argument(
+            '--compare', help='JSON предыдущего прогона для сравнения.',
+        )
+        parser.add_argument(
+            '--max-regression', type=float,
+            help='Допустимый рост p95 в процентах относительно --compare.',
+        )
+
+    def handle(self, *args, **options):
+        sample = self.sample()
+        html_client = Client()
+        api_client = Client()
+        if not options['anonymous']:
+            html_client.force_login(sample['user'])
+            token, _ = Token.objects.get_or_create(user=sample['user'])
+            api_client.defaults['HTTP_AUTHORIZATION'] = f'Token {token.key}'
+
+        targets = [
+            (f'GET {path}', api_client, self.api_url(path, sample))
+            for path in http_requests(options['http_dir'])
+        ]
+        for name, args in HTML_VIEWS:
+            url = reverse(name, args=[sample[arg] for arg in args])
+            if name == 'posts:search':
+                url += f'?q={sample["word"]}'
+            targets.append((name, html_client, url))
+
+        cache.clear()
+        authentication.token_cache.clear()
+        results = {
+            'started': timezone.now().isoformat(),
+            'requests': options['requests'],
+            'anonymous': options['anonymous'],
+            'rows': {
+                model.__name__: model.objects.count()
+                for model in (User, Group, Post, Comment)
+            },
+            'endpoints': {},
+        }
+        # Прогон не должен расходовать общие лимиты API и упираться в 429.
+        with mock.patch.object(
+            throttling.FixedWindowMixin, 'allow_request',
+            lambda throttle, request, view: True,
+        ):
+            for name, client, url in targets:
+                results['endpoints'][name] = self.measure(
+                    client, url, options['requests'], options['warmup'],
+                    options['anonymous'],
+                )
+        if not options['anonymous']:
+            results['token_cache'] = authentication.stats()
+
+        report = json.dumps(results, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
+        failed = [
+            f'{name} ({result["status"]})'
+            for name, result in results['endpoints'].items()
+            if result['errors']
+        ]
+        if failed:
+            raise CommandError('Ответы не 2xx: ' + ', '.join(failed))
+        if options['compare']:
+            self.compare(
+                results, options['compare'], options['max_regression']
+            )
+
+    def sample(self):
+        """Типичные объекты, которые подставляются в адреса."""
+        user = User.objects.order_by('-following_count').first()
+        post = Post.objects.order_by('-comments_count').first()
+        comment = Comment.objects.filter(post=post).first()
+        group = (
+            Group.objects.filter(post__isnull=False).first()
+            or Group.objects.first()
+        )
+        author = User.objects.order_by('-posts_count').first()
+        if not all((user, post, comment, group)):
+            raise CommandError(
+                'Нужны пользователи, группы, посты и комментарии: '
+                'заполните базу командой seed_data.'
+            )
+        return {
+            'user': user,
+            'username': author.username,
+            'post_id': post.id,
+            'comment_id': comment.id,
+            'group_id': group.id,
+            'slug': group.slug,
+            'word': (post.text.split() or ['пост'])[0].strip('.,!?'),
+        }
+
+    def api_url(self, path, sample):
+        """Заменяет id из примера в ``.http`` на существующие объекты."""
+        url = urlsplit(path)
+        match = resolve(url.path)
+        kwargs = {}
+        for key in match.kwargs:
+            if key == 'pk':
+                kwargs[key] = sample[API_PK[match.url_name.split('-')[0]]]
+            else:
+                kwargs[key] = sample[key]
+        resolved = reverse(match.view_name, kwargs=kwargs)
+        return resolved + (f'?{url.query}' if url.query else '')
+
+    @staticmethod
+    def fetch(client, url):
+        """Запрос с чтением всего тела, в том числе потокового ответа."""
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def measure(self, client, url, count, warmup, anonymous=False):
+        # Без входа страницы только для пользователей отвечают
+        # переходом на вход или 401/403, это не ошибка прогона.
+        expected = {302, 401, 403} if anonymous else set()
+        statuses = []
+        queries = 0
+        for _ in range(max(warmup, 1)):
+            with ExitStack() as stack:
+                captured = [
+                    stack.enter_context(CaptureQueriesContext(connection))
+                    for connection in connections.all()
+                ]
+                statuses.append(self.fetch(client, url).status_code)
+            queries = sum(len(context) for context in captured)
+        timings = []
+        started = time.perf_counter()
+        for _ in range(count):
+            start = time.perf_counter()
+            statuses.append(self.fetch(client, url).status_code)
+            timings.append((time.perf_counter() - start) * 1000)
+        elapsed = time.perf_counter() - started
+        errors = [
+            status for status in statuses
+            if not 200 <= status < 300 and status not in expected
+        ]
+        return {
+            'url': url,
+            'status': errors[0] if errors else statuses[-1],
+            'errors': len(errors),
+            'sql_queries': queries,
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'rps': round(count / elapsed, 1) if elapsed else None,
+        }
+
+    def compare(self, results, path, max_regression):
+        with open(path, encoding='utf-8') as file:
+            baseline = json.load(file)['endpoints']
+        regressions = []
+        for name, current in results['endpoints'].items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            change = (current['p95_ms'] / (before['p95_ms'] or 1e-3) - 1) * 100
+            self.stderr.write(
+                f'{name}: p95 {before["p95_ms"]} -> {current["p95_ms"]} мс '
+                f'({change:+.1f}%), SQL {before["sql_queries"]} -> '
+                f'{current["sql_queries"]}'
+            )
+            if max_regression is not None and change > max_regression:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(
+                'p95 вырос больше допустимого: ' + ', '.join(regressions)
+            )
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from yatube.settings import SQLITE_PRODUCTION_PRAGMAS
+
+from core.db import write_lock
+from posts.models import Post
+
+from .benchmark import percentile
+from .sync_replica import copy_database
+
+# Транзакция записи как у add_comment: чтение поста, затем запись.
+SELECT_POST_SQL = 'SELECT id, author_id FROM posts_post WHERE id = ?'
+
+INSERT_COMMENT_SQL = (
+    'INSERT INTO posts_comment (post_id, author_id, text, pub_date) '
+    "VALUES (?, ?, 'benchmark', datetime('now'))"
+)
+
+UPDATE_POST_SQL = (
+    'UPDATE posts_post SET comments_count = comments_count + 1 WHERE id = ?'
+)
+
+READ_SQL = (
+    'SELECT posts_post.id, posts_post.text, posts_user.username '
+    'FROM posts_post JOIN posts_user ON posts_user.id = posts_post.author_id '
+    'ORDER BY posts_post.pub_date DESC, posts_post.id DESC LIMIT 10'
+)
+
+
+class Workload:
+    """Писатели и читатели над одной копией базы."""
+
+    def __init__(self, path, production, post_id, author_id):
+        self.path = path
+        self.production = production
+        self.post_id = post_id
+        self.author_id = author_id
+        self.done = threading.Event()
+        self.writes, self.write_errors = [], 0
+        self.reads, self.read_errors = [], 0
+        self.stats_lock = threading.Lock()
+
+    def connect(self):
+        # Как у Django: таймаут 5 секунд, BEGIN выдаёт сам код.
+        connection = sqlite3.connect(
+            self.path, timeout=5, isolation_level=None,
+            check_same_thread=False,
+        )
+        if self.production:
+            for name, value in SQLITE_PRODUCTION_PRAGMAS.items():
+                connection.execute(f'PRAGMA {name} = {value}')
+        else:
+            connection.execute('PRAGMA journal_mode = DELETE')
+        return connection
+
+    def write_once(self, connection):
+        connection.execute('BEGIN')
+        try:
+            connection.execute(SELECT_POST_SQL, [self.post_id]).fetchone()
+            connection.execute(
+                INSERT_COMMENT_SQL, [self.post_id, self.author_id]
+            )
+            connection.execute(UPDATE_POST_SQL, [self.post_id])
+            connection.execute('COMMIT')
+        except sqlite3.OperationalError:
+            connection.execute('ROLLBACK')
+            raise
+
+    def writer(self, count):
+        connection = self.connect()
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                if self.production:
+                    with write_lock(f'{self.path}.lock'):
+                        self.write_once(connection)
+                else:
+                    self.write_once(connection)
+            except sqlite3.OperationalError:
+                with self.stats_lock:
+                    self.write_errors += 1
+                continue
+            with self.stats_lock:
+                self.writes.append((time.perf_counter() - start) * 1000)
+        connection.close()
+
+    def reader(self):
+        connection = self.connect()
+        while not self.done.is_set():
+            start = time.perf_counter()
+            try:
+                connection.execute(READ_SQL).fetchall()
+            except sqlite3.OperationalError:
+                with self.stats_lock:
+                    self.read_errors += 1
+                continue
+            with self.stats_lock:
+                self.reads.append((time.perf_counter() - start) * 1000)
+        connection.close()
+
+    def run(self, writers, readers, writes):
+        self.connect().close()
+        reader_threads = [
+            threading.Thread(target=self.reader) for _ in range(readers)
+        ]
+        writer_threads = [
+            threading.Thread(target=self.writer, args=(writes,))
+            for _ in range(writers)
+        ]
+        start = time.perf_counter()
+        for thread in reader_threads + writer_threads:
+            thread.start()
+        for thread in writer_threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        self.done.set()
+        for thread in reader_threads:
+            thread.join()
+        return {
+            'seconds': round(elapsed, 3),
+            'writes': summary(self.writes, self.write_errors, elapsed),
+            'reads': summary(self.reads, self.read_errors, elapsed),
+        }
+
+
+def summary(timings, errors, elapsed):
+    result = {
+        'ok': len(timings),
+        'errors': errors,
+        'per_second': round(len(timings) / elapsed, 1),
+    }
+    if timings:
+        for percent in (50, 95, 99):
+            result[f'p{percent}_ms'] = round(
+                percentile(timings, percent), 3
+            )
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает конкурентные чтение и запись в копии базы SQLite '
+        'без настроек и с профилем production: WAL, PRAGMA и очередь записи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument(
+            '--writes', type=int, default=50,
+            help='Транзакций записи на одного писателя.',
+        )
+        parser.add_argument(
+            '--output', help='Файл для результатов вместо stdout.',
+        )
+
+    def handle(self, *args, **options):
+        row = Post.objects.values_list('id', 'author_id').first()
+        if row is None:
+            raise CommandError(
+                'В базе нет постов: заполните её командой seed_data.'
+            )
+        with tempfile.TemporaryDirectory() as directory:
+            results = {
+                'started': timezone.now().isoformat(),
+                'writers': options['writers'],
+                'readers': options['readers'],
+                'writes_per_writer': options['writes'],
+            }
+            for profile in ('development', 'production'):
+                path = os.path.join(directory, f'{profile}.sqlite3')
+                copy_database(path)
+                results[profile] = Workload(
+                    path, profile == 'production', *row
+                ).run(
+                    options['writers'], options['readers'], options['writes']
+                )
+        report = json.dumps(results, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
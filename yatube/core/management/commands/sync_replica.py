@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from yatube.settings import DATABASE_REPLICAS
+
+
+def copy_database(target):
+    """Копирует основную базу SQLite в файл ``target`` целиком.
+
+    Копия пишется во временный файл и подменяет реплику атомарно,
+    поэтому читатели реплики никогда не видят её наполовину записанной.
+    """
+    source = connections['default']
+    source.ensure_connection()
+    temporary = f'{target}.tmp'
+    destination = sqlite3.connect(temporary)
+    try:
+        source.connection.backup(destination)
+    finally:
+        destination.close()
+    os.replace(temporary, target)
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик. С --interval '
+        'повторяет копирование, имитируя отставание реплики.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'targets', nargs='*',
+            help='Файлы реплик; по умолчанию все из DATABASE_REPLICAS.',
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование каждые N секунд.',
+        )
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Команда копирует только базы SQLite.')
+        targets = options['targets'] or [
+            connections[alias].settings_dict['NAME']
+            for alias in DATABASE_REPLICAS
+        ]
+        if not targets:
+            raise CommandError(
+                'Реплики не настроены: задайте DATABASE_REPLICAS.'
+            )
+        while True:
+            for target in targets:
+                copy_database(target)
+            self.stdout.write(f'Реплики обновлены: {", ".join(targets)}')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
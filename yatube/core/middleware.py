@@ -0,0 +1,137 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from yatube.settings import (CACHE_SHARED, DATABASE_REPLICAS,
+                             PROFILING_SAMPLE_RATE, PROFILING_SLOW_LOG,
+                             PROFILING_SLOW_MS, REPLICA_STICKY_COOKIE,
+                             REPLICA_STICKY_SECONDS)
+
+from . import auth, profiling, routers
+
+_log_lock = threading.Lock()
+
+
+class ProfilingMiddleware:
+    """Замеряет SQL, шаблоны и миниатюры в выборке запросов.
+
+    Итог отдаётся заголовком ``Server-Timing``, а запросы дольше
+    ``PROFILING_SLOW_MS`` дописываются в журнал ``PROFILING_SLOW_LOG``
+    вместе с SQL. При нулевой доле выборки middleware не подключается.
+    """
+
+    def __init__(self, get_response):
+        if not PROFILING_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        profiling.instrument_templates()
+
+    def __call__(self, request):
+        if random.random() >= PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        profile = profiling.RequestProfile()
+        start = time.perf_counter()
+        with profiling.activate(profile), ExitStack() as stack:
+            # SQL к репликам тоже входит в замер.
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(profile.execute)
+                )
+            response = self.get_response(request)
+        total = (time.perf_counter() - start) * 1000
+        response['Server-Timing'] = self.server_timing(profile, total)
+        if total >= PROFILING_SLOW_MS:
+            self.log_slow(request, response, profile, total)
+        return response
+
+    @staticmethod
+    def server_timing(profile, total):
+        # Части не пересекаются: время SQL и миниатюр при рендеринге
+        # не входит в tpl, остаток — код view.
+        tpl = profile.timings.get('tpl', 0.0)
+        view = total - profile.measured_ms() - tpl
+        metrics = [
+            ('db', profile.sql_ms, f'SQL x{profile.sql_count}'),
+            ('tpl', tpl, 'templates'),
+            ('view', max(view, 0.0), 'python'),
+            ('total', total, 'total'),
+        ]
+        if 'thumb' in profile.timings:
+            metrics.insert(2, ('thumb', profile.timings['thumb'], 'sorl'))
+        return ', '.join(
+            f'{name};dur={ms:.1f};desc="{desc}"'
+            for name, ms, desc in metrics
+        )
+
+    @staticmethod
+    def log_slow(request, response, profile, total):
+        entry = {
+            'time': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'user_id': getattr(getattr(request, 'user', None), 'pk', None),
+            'total_ms': round(total, 3),
+            'sql_ms': round(profile.sql_ms, 3),
+            'sql_count': profile.sql_count,
+            'timings_ms': {
+                name: round(ms, 3) for name, ms in profile.timings.items()
+            },
+            'sql': profile.sql,
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        os.makedirs(os.path.dirname(PROFILING_SLOW_LOG), exist_ok=True)
+        with _log_lock, open(PROFILING_SLOW_LOG, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+class ReplicaStickinessMiddleware:
+    """Оставляет недавно писавшего пользователя на основной базе.
+
+    После запроса с записью в БД ставится cookie на
+    ``REPLICA_STICKY_SECONDS``: пока она есть, запросы пользователя
+    не читают с реплик и видят свои изменения, даже если реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        if not DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sticky = REPLICA_STICKY_COOKIE in request.COOKIES
+        with routers.request_scope(sticky=sticky) as scope:
+            response = self.get_response(request)
+        if scope['wrote']:
+            response.set_cookie(
+                REPLICA_STICKY_COOKIE, '1',
+                max_age=REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class UserSnapshotMiddleware:
+    """Берёт ``request.user`` из кэша, см. ``core.auth``.
+
+    Стоит после ``AuthenticationMiddleware`` и заменяет её ленивого
+    пользователя, который так и не читается из базы. Без кэша, общего
+    для процессов, middleware не подключается.
+    """
+
+    def __init__(self, get_response):
+        if not CACHE_SHARED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.user = SimpleLazyObject(lambda: auth.get_user(request))
+        return self.get_response(request)
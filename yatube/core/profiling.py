@@ -0,0 +1,106 @@
+"""Замер времени запроса по частям: SQL, шаблоны, миниатюры.
+
+Замер включает ``core.middleware.ProfilingMiddleware`` для выборки
+запросов. Профиль текущего запроса хранится в потоке, поэтому
+``timed()`` и обёртки ничего не стоят вне замеряемых запросов.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.template.backends.django import Template
+from yatube.settings import PROFILING_MAX_SQL
+
+_local = threading.local()
+
+
+class RequestProfile:
+    """Счётчики времени одного запроса, в миллисекундах."""
+
+    def __init__(self):
+        self.sql = []
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.timings = {}
+
+    def add(self, name, ms):
+        self.timings[name] = self.timings.get(name, 0.0) + ms
+
+    def measured_ms(self):
+        """Время SQL и замеров ``timed()``, кроме шаблонов."""
+        return self.sql_ms + sum(
+            ms for name, ms in self.timings.items() if name != 'tpl'
+        )
+
+    def execute(self, execute, sql, params, many, context):
+        """Обёртка ``connection.execute_wrapper`` для замера SQL."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.sql_count += 1
+            self.sql_ms += ms
+            if len(self.sql) < PROFILING_MAX_SQL:
+                self.sql.append({
+                    'db': context['connection'].alias,
+                    'sql': sql,
+                    'ms': round(ms, 3),
+                })
+
+
+def current():
+    """Профиль замеряемого запроса или ``None``."""
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def activate(profile):
+    _local.profile = profile
+    try:
+        yield profile
+    finally:
+        _local.profile = None
+
+
+@contextmanager
+def timed(name):
+    """Добавляет время блока к счётчику ``name`` текущего профиля."""
+    profile = current()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, (time.perf_counter() - start) * 1000)
+
+
+def _timed_render(render):
+    @wraps(render)
+    def wrapper(self, *args, **kwargs):
+        profile = current()
+        # Вложенные шаблоны уже учтены во внешнем.
+        if profile is None or getattr(_local, 'rendering', False):
+            return render(self, *args, **kwargs)
+        _local.rendering = True
+        measured = profile.measured_ms()
+        start = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            _local.rendering = False
+            # Ленивые queryset и миниатюры выполняются при рендеринге,
+            # их время уже учтено в SQL и в своих счётчиках.
+            ms = (time.perf_counter() - start) * 1000
+            profile.add('tpl', ms - (profile.measured_ms() - measured))
+    wrapper.profiled = True
+    return wrapper
+
+
+def instrument_templates():
+    """Включает замер рендеринга шаблонов Django один раз на процесс."""
+    if not getattr(Template.render, 'profiled', False):
+        Template.render = _timed_render(Template.render)
@@ -0,0 +1,102 @@
+"""Чтение с реплик базы данных.
+
+Запросы читают с реплики только внутри ``replica_reads()``: его включают
+декоратор ``read_from_replica`` у страниц и ``api.mixins.ReplicaReads``
+у безопасных методов API. Всё остальное, включая любое чтение после
+записи в том же запросе и запросы «липкого» пользователя, который
+недавно что-то записал, идёт в основную базу.
+
+Ответы, которые кэшируются или получают ETag по поколениям
+``posts.caching``, строятся внутри ``primary_reads()``: поколение
+увеличивается при записи в основную базу, и страница, прочитанная
+с отстающей реплики, закрепилась бы в кэше под новым поколением.
+"""
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db import connections
+from yatube.settings import DATABASE_REPLICAS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = threading.local()
+
+
+@contextmanager
+def replica_reads():
+    """Разрешает читать с реплики внутри блока."""
+    previous = getattr(_state, 'replica', False)
+    _state.replica = True
+    try:
+        yield
+    finally:
+        _state.replica = previous
+
+
+@contextmanager
+def primary_reads():
+    """Читает из основной базы внутри блока, даже под ``replica_reads``."""
+    previous = getattr(_state, 'primary', False)
+    _state.primary = True
+    try:
+        yield
+    finally:
+        _state.primary = previous
+
+
+@contextmanager
+def request_scope(sticky=False):
+    """Состояние маршрутизации одного HTTP-запроса.
+
+    ``sticky`` — пользователь недавно писал и должен читать свои записи
+    из основной базы. Блок отдаёт словарь, в котором после выхода
+    ``wrote`` показывает, была ли запись.
+    """
+    _state.primary = sticky
+    _state.wrote = False
+    result = {}
+    try:
+        yield result
+    finally:
+        result['wrote'] = _state.wrote
+        _state.primary = False
+        _state.wrote = False
+
+
+def read_from_replica(view):
+    """Декоратор view: безопасные запросы читают с реплики."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        use_replica = (
+            DATABASE_REPLICAS
+            and getattr(_state, 'replica', False)
+            and not getattr(_state, 'primary', False)
+            and not getattr(_state, 'wrote', False)
+            and not connections['default'].in_atomic_block
+        )
+        if use_replica:
+            return random.choice(DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in DATABASE_REPLICAS:
+            return False
+        return None
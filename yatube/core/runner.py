@@ -0,0 +1,34 @@
+"""Запуск тестов без записи в файлы SQLite сервера.
+
+Счётчики ``core.shared`` (лимиты API, поколения кэша страниц) на время
+тестов хранятся во временном каталоге, общем для всех потоков.
+"""
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test.runner import DiscoverRunner
+
+SHARED_DATABASES = {
+    'api.throttling.THROTTLE_DATABASE': 'throttle.sqlite3',
+    'posts.caching.CACHE_GENERATIONS_DATABASE': 'generations.sqlite3',
+}
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.shared_dir = tempfile.mkdtemp()
+        self.shared_patches = [
+            mock.patch(target, os.path.join(self.shared_dir, name))
+            for target, name in SHARED_DATABASES.items()
+        ]
+        for patch in self.shared_patches:
+            patch.start()
+
+    def teardown_test_environment(self, **kwargs):
+        for patch in self.shared_patches:
+            patch.stop()
+        shutil.rmtree(self.shared_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
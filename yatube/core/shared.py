@@ -0,0 +1,26 @@
+"""Файлы SQLite со счётчиками, общими для процессов сервера.
+
+``LocMemCache`` у каждого процесса свой, поэтому счётчики, которые
+должны совпадать во всех процессах (лимиты частоты запросов API,
+поколения кэша страниц), хранятся в отдельных файлах SQLite в режиме
+WAL. Соединение открывается одно на поток и файл.
+"""
+import sqlite3
+import threading
+
+_local = threading.local()
+
+
+def connection(path, schema_sql):
+    """Соединение потока с файлом ``path``; таблицы создаются при открытии."""
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    current = connections.get(path)
+    if current is None:
+        current = sqlite3.connect(path, timeout=5, isolation_level=None)
+        current.execute('PRAGMA journal_mode = WAL')
+        current.execute('PRAGMA synchronous = NORMAL')
+        current.execute(schema_sql)
+        connections[path] = current
+    return current
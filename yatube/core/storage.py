@@ -0,0 +1,106 @@
+"""Хранилища файлов: картинки по содержимому и статика с хэшами.
+
+Картинка сохраняется под именем ``<каталог>/<sha256 содержимого><расширение>``:
+хэш считается по ходу записи во временный файл, и одинаковые загрузки
+ложатся в один файл. Миниатюры sorl привязаны к имени исходного файла,
+поэтому у дубликатов они тоже общие. Удалять такие файлы можно только
+когда на них не осталось ссылок — счётчик ведёт ``posts.blobs``,
+а проверка дубликата и удаление файла идут под общей блокировкой ``lock``.
+"""
+import gzip
+import hashlib
+import os
+import posixpath
+import tempfile
+from contextlib import contextmanager
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import locks
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from yatube.settings import STATIC_COMPRESSED_EXTENSIONS
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # Итоговое имя зависит только от содержимого и выбирается
+        # в ``_save``, существующий файл с тем же именем — это дубликат.
+        return name
+
+    @contextmanager
+    def lock(self, name):
+        """Блокировка каталога файла ``name``, общая для процессов."""
+        directory = self.path(posixpath.dirname(name))
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, '.lock'), 'ab') as lock_file:
+            locks.lock(lock_file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(lock_file)
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        full_directory = self.path(directory)
+        os.makedirs(full_directory, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(
+            dir=full_directory, prefix='.upload-'
+        )
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            name = posixpath.join(directory, digest.hexdigest() + extension)
+            full_path = self.path(name)
+            with self.lock(name):
+                if os.path.exists(full_path):
+                    os.remove(temp_path)
+                    # Пост с этим файлом ещё не сохранён: свежее время
+                    # изменения не даёт удалить файл без ссылок.
+                    os.utime(full_path)
+                else:
+                    # ``mkstemp`` создаёт файл с правами 0600.
+                    os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                    os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+
+@deconstructible
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и сжатыми копиями.
+
+    ``collectstatic`` кроме хэшированных файлов пишет рядом ``.gz``
+    и ``.br`` для текстовых форматов — при раздаче их не нужно сжимать
+    на каждом запросе.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if posixpath.splitext(name)[1] in STATIC_COMPRESSED_EXTENSIONS:
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        variants = [
+            ('.gz', gzip.compress(content, 9, mtime=0)),
+            ('.br', brotli.compress(content)),
+        ]
+        for suffix, compressed in variants:
+            # Сжатая копия, которая не меньше оригинала, бесполезна.
+            if len(compressed) < len(content):
+                self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
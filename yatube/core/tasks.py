@@ -0,0 +1,30 @@
+"""Фоновые задачи в пуле потоков процесса."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections, transaction
+from yatube.settings import BACKGROUND_TASKS_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=BACKGROUND_TASKS_WORKERS,
+    thread_name_prefix='yatube-task',
+)
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась ошибкой', func)
+    finally:
+        # Соединения с БД у каждого потока свои, закрываем их сами.
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """Выполняет ``func`` в фоновом потоке после коммита транзакции."""
+    transaction.on_commit(
+        lambda: _executor.submit(_run, func, args, kwargs)
+    )
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from api import throttling
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from posts.models import Comment, Group, Post, User
+
+
+class BenchmarkCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='author')
+        group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        post = Post.objects.create(
+            text='Тестовый пост', author=author, group=group
+        )
+        Comment.objects.create(post=post, author=author, text='Комментарий')
+
+    def run_benchmark(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            'benchmark', '--requests', '2', '--warmup', '1', *args,
+            stdout=stdout, stderr=stderr,
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_report(self):
+        """Отчёт содержит метрики по API и страницам сайта."""
+        report = json.loads(self.run_benchmark()[0])
+        endpoints = report['endpoints']
+        for name in ('GET /api/v1/posts/', 'posts:index', 'posts:profile'):
+            with self.subTest(endpoint=name):
+                self.assertEqual(endpoints[name]['status'], 200)
+                for key in ('p50_ms', 'p95_ms', 'p99_ms', 'rps'):
+                    self.assertIn(key, endpoints[name])
+                self.assertGreater(endpoints[name]['sql_queries'], 0)
+
+    def test_streaming_body_consumed(self):
+        """Потоковый экспорт замеряется вместе с телом ответа."""
+        endpoints = json.loads(self.run_benchmark()[0])['endpoints']
+        export = next(
+            result for name, result in endpoints.items()
+            if name.startswith('GET /api/v1/export/')
+        )
+        self.assertEqual(export['status'], 200)
+        self.assertGreater(export['sql_queries'], 0)
+
+    @mock.patch.object(
+        throttling.AnonRateThrottle, 'THROTTLE_RATES', {'anon': '1/day'}
+    )
+    def test_throttling_disabled(self):
+        endpoints = json.loads(self.run_benchmark('--anonymous')[0])[
+            'endpoints'
+        ]
+        self.assertEqual(endpoints['GET /api/v1/posts/']['errors'], 0)
+
+    def test_error_responses_fail(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'bad.http'), 'w') as file:
+                file.write('GET http://localhost/api/v1/export/?since=x\n')
+            with self.assertRaisesMessage(CommandError, '(400)'):
+                self.run_benchmark('--http-dir', directory)
+
+    def test_compare(self):
+        """Сравнение с прошлым прогоном печатает изменения по адресам."""
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+            self.run_benchmark('--output', baseline)
+            _, stderr = self.run_benchmark(
+                '--output', os.path.join(directory, 'current.json'),
+                '--compare', baseline,
+            )
+        self.assertIn('posts:index: p95', stderr)
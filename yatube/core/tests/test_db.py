@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+from ..db import configure_sqlite, write_lock
+
+User = get_user_model()
+
+
+class SqliteProfileTests(TestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        """Настройки PRAGMA применяются к соединению."""
+        with mock.patch('core.db.SQLITE_PRAGMAS', {'cache_size': -4321}):
+            configure_sqlite(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -4321)
+            cursor.execute('PRAGMA cache_size = -2000')
+
+    def test_write_lock_queues_other_threads(self):
+        """Пока блокировка записи занята, другой поток ждёт."""
+        acquired = threading.Event()
+
+        def other_writer(path):
+            with write_lock(path):
+                acquired.set()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'db.lock')
+            with write_lock(path):
+                with write_lock(path):
+                    thread = threading.Thread(
+                        target=other_writer, args=(path,)
+                    )
+                    thread.start()
+                    self.assertFalse(acquired.wait(0.2))
+            thread.join(5)
+        self.assertTrue(acquired.is_set())
+
+    def test_serialized_views_write(self):
+        """Запись через очередь работает в view."""
+        user = User.objects.create_user(username='auth')
+        post = Post.objects.create(text='Тестовый пост', author=user)
+        client = Client()
+        client.force_login(user)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        lock_path = os.path.join(directory, 'db.lock')
+        with mock.patch('core.db.SQLITE_SERIALIZE_WRITES', True), \
+                mock.patch('core.db.SQLITE_WRITE_LOCK', lock_path):
+            client.post(
+                reverse('posts:add_comment', kwargs={'post_id': post.id}),
+                data={'text': 'Комментарий'},
+            )
+        self.assertTrue(Comment.objects.filter(text='Комментарий').exists())
+
+
+class ConcurrencyBenchmarkTests(TransactionTestCase):
+    def test_report(self):
+        """Бенчмарк сравнивает оба профиля, в production нет ошибок записи."""
+        user = User.objects.create_user(username='auth')
+        Post.objects.create(text='Тестовый пост', author=user)
+        out = StringIO()
+        call_command(
+            'sqlite_concurrency_benchmark',
+            '--writers', '4', '--readers', '2', '--writes', '5',
+            stdout=out,
+        )
+        report = json.loads(out.getvalue())
+        for profile in ('development', 'production'):
+            self.assertIn('per_second', report[profile]['reads'])
+        self.assertEqual(report['production']['writes']['ok'], 20)
+        self.assertEqual(report['production']['writes']['errors'], 0)
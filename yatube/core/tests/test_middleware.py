@@ -0,0 +1,182 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from importlib import import_module
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.template import engines
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post
+
+from .. import auth, profiling
+
+User = get_user_model()
+
+
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(text='Тестовый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def profiled_client(self, **settings):
+        options = {'PROFILING_SAMPLE_RATE': 1.0, **settings}
+        for name, value in options.items():
+            patcher = mock.patch(f'core.middleware.{name}', value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        client = Client()
+        client.force_login(ProfilingMiddlewareTests.user)
+        return client
+
+    def test_server_timing_header(self):
+        """Замеряемый запрос получает заголовок Server-Timing."""
+        response = self.profiled_client().get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'tpl;dur=', 'view;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertRegex(timing, r'desc="SQL x[1-9]')
+
+    def test_disabled_profiling(self):
+        """Без выборки заголовка нет."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_slow_request_logged(self):
+        """Медленный запрос дописывается в журнал вместе с SQL."""
+        with tempfile.TemporaryDirectory() as directory:
+            log = os.path.join(directory, 'logs', 'slow.jsonl')
+            client = self.profiled_client(
+                PROFILING_SLOW_MS=0, PROFILING_SLOW_LOG=log
+            )
+            client.get(reverse('posts:index'))
+            client.get(reverse('posts:groups'))
+            with open(log, encoding='utf-8') as file:
+                entries = [json.loads(line) for line in file]
+        self.assertEqual(
+            [entry['path'] for entry in entries],
+            [reverse('posts:index'), reverse('posts:groups')],
+        )
+        self.assertEqual(entries[0]['status'], 200)
+        self.assertEqual(len(entries[0]['sql']), entries[0]['sql_count'])
+        self.assertIn('tpl', entries[0]['timings_ms'])
+        self.assertEqual(entries[0]['sql'][0]['db'], 'default')
+
+
+class RequestProfileTests(SimpleTestCase):
+    def test_thumbnails_not_counted_in_templates(self):
+        """Время миниатюр при рендеринге не входит в tpl."""
+        clock = [0.0]
+
+        def thumbnail():
+            with profiling.timed('thumb'):
+                clock[0] += 0.1
+            clock[0] += 0.02
+            return ''
+
+        profiling.instrument_templates()
+        profile = profiling.RequestProfile()
+        with mock.patch('core.profiling.time.perf_counter',
+                        lambda: clock[0]), profiling.activate(profile):
+            engines['django'].from_string('{{ thumbnail }}').render(
+                {'thumbnail': thumbnail}
+            )
+        self.assertAlmostEqual(profile.timings['thumb'], 100.0)
+        self.assertAlmostEqual(profile.timings['tpl'], 20.0)
+
+
+class UserSnapshotMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Снимки включаются только с кэшем, общим для процессов.
+        patcher = mock.patch('core.middleware.CACHE_SHARED', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(
+            username='auth', first_name='Имя', password='old-password'
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_page_without_session_and_user_queries(self):
+        """Повторная страница не читает пользователя из базы."""
+        url = reverse('about:author')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, 'Имя')
+        # Остаётся только чтение сессии: по умолчанию она хранится в базе.
+        self.assertEqual(len(queries), 1)
+        self.assertIn('django_session', queries[0]['sql'])
+
+    def test_password_change_ends_sessions(self):
+        self.client.get(reverse('about:author'))
+        self.user.set_password('new-password')
+        self.user.save()
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_snapshot_refreshed_after_save(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        self.user.first_name = 'Новое'
+        self.user.save()
+        self.assertContains(self.client.get(url), 'Новое')
+
+    def test_logout_ends_session_in_other_worker(self):
+        """Выход в одном процессе завершает сессию и в другом."""
+        worker_cache = LocMemCache('other-worker', {})
+
+        def other_worker_user():
+            engine = import_module(settings.SESSION_ENGINE)
+            request = RequestFactory().get('/')
+            sessions_cache = mock.patch(
+                'django.contrib.sessions.backends.cached_db.caches',
+                {'default': worker_cache},
+            )
+            with mock.patch.object(auth, 'cache', worker_cache), \
+                    sessions_cache:
+                request.session = engine.SessionStore(session_key)
+                return auth.get_user(request)
+
+        self.client.get(reverse('about:author'))
+        session_key = self.client.session.session_key
+        self.assertEqual(other_worker_user(), self.user)
+        self.client.logout()
+        self.assertFalse(other_worker_user().is_authenticated)
+
+
+class ProcessLocalCacheTests(TestCase):
+    def test_no_snapshot_without_shared_cache(self):
+        """С LocMemCache смена пароля в другом процессе видна сразу."""
+        user = User.objects.create_user(username='auth', password='old')
+        client = Client()
+        client.force_login(user)
+        url = reverse('posts:follow_index')
+        self.assertEqual(client.get(url).status_code, 200)
+        # Запись без сигналов, как из другого процесса.
+        User.objects.filter(pk=user.pk).update(password='changed')
+        self.assertEqual(client.get(url).status_code, 302)
+
+    def test_cached_db_sessions_refused(self):
+        env = {**os.environ, 'SESSION_BACKEND': 'cached_db'}
+        result = subprocess.run(
+            [sys.executable, '-c', 'import yatube.settings'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('ImproperlyConfigured', result.stderr)
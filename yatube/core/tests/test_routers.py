@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         TransactionTestCase)
+
+from posts import caching
+from posts.models import Post, User
+
+from ..middleware import ReplicaStickinessMiddleware
+from ..routers import ReplicaRouter, read_from_replica, request_scope
+
+REPLICAS = ['replica1', 'replica2']
+
+
+@read_from_replica
+def routed_view(request):
+    """Возвращает базу, с которой view прочитал бы посты."""
+    return HttpResponse(ReplicaRouter().db_for_read(Post) or 'default')
+
+
+@mock.patch('core.routers.DATABASE_REPLICAS', REPLICAS)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def routed(self, request, sticky=False):
+        with request_scope(sticky=sticky):
+            return routed_view(request).content.decode()
+
+    def test_safe_requests_read_from_replica(self):
+        """GET в помеченных view читает с реплики."""
+        self.assertIn(self.routed(self.factory.get('/')), REPLICAS)
+
+    def test_primary_reads(self):
+        """Запись, «липкий» пользователь и чтение вне view — основная база."""
+        self.assertEqual(self.routed(self.factory.post('/')), 'default')
+        self.assertEqual(
+            self.routed(self.factory.get('/'), sticky=True), 'default'
+        )
+        self.assertIsNone(ReplicaRouter().db_for_read(Post))
+
+    def test_read_after_write_uses_primary(self):
+        """После записи в том же запросе чтение идёт в основную базу."""
+        router = ReplicaRouter()
+        with request_scope() as scope:
+            with mock.patch('core.routers._state.replica', True, create=True):
+                self.assertIn(router.db_for_read(Post), REPLICAS)
+                router.db_for_write(Post)
+                self.assertIsNone(router.db_for_read(Post))
+        self.assertTrue(scope['wrote'])
+
+    def test_cached_and_etagged_responses_read_primary(self):
+        """Ответ под поколением кэша не читается с отстающей реплики."""
+        cache.clear()
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        cached_view = caching.cache_anonymous_page('all')(routed_view)
+        with request_scope():
+            self.assertIn(routed_view(request).content.decode(), REPLICAS)
+            self.assertEqual(cached_view(request).content.decode(), 'default')
+            response = caching.conditional_response(
+                request, '"etag"', lambda: routed_view(request)
+            )
+        self.assertEqual(response.content.decode(), 'default')
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(ReplicaRouter().allow_migrate('replica1', 'posts'))
+        self.assertIsNone(ReplicaRouter().allow_migrate('default', 'posts'))
+
+
+@mock.patch('core.middleware.DATABASE_REPLICAS', REPLICAS)
+class ReplicaStickinessTests(TestCase):
+    def test_write_sets_sticky_cookie(self):
+        """Запрос с записью оставляет пользователя на основной базе."""
+        def view(request):
+            User.objects.create_user(username='writer')
+            return HttpResponse()
+        middleware = ReplicaStickinessMiddleware(view)
+        response = middleware(RequestFactory().post('/'))
+        self.assertIn('read_primary', response.cookies)
+
+        middleware = ReplicaStickinessMiddleware(
+            lambda request: HttpResponse()
+        )
+        response = middleware(RequestFactory().get('/'))
+        self.assertNotIn('read_primary', response.cookies)
+
+
+class SyncReplicaTests(TransactionTestCase):
+    # Копирование ждёт, пока в исходной базе есть открытая транзакция
+    # записи, поэтому тест идёт без обёртки TestCase.
+    def test_copies_database(self):
+        """Реплика получает копию основной базы."""
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Тестовый пост', author=author)
+        with tempfile.TemporaryDirectory() as directory:
+            target = os.path.join(directory, 'replica.sqlite3')
+            call_command('sync_replica', target, stdout=StringIO())
+            replica = sqlite3.connect(target)
+            try:
+                count = replica.execute(
+                    'SELECT COUNT(*) FROM posts_post'
+                ).fetchone()[0]
+            finally:
+                replica.close()
+        self.assertEqual(count, 1)
@@ -0,0 +1,16 @@
+import tempfile
+
+from api import throttling
+from django.test import SimpleTestCase
+from posts import caching
+
+
+class TestRunnerTests(SimpleTestCase):
+    def test_shared_databases_in_temp_dir(self):
+        """Файлы счётчиков на время тестов лежат во временном каталоге."""
+        for path in (
+            throttling.THROTTLE_DATABASE,
+            caching.CACHE_GENERATIONS_DATABASE,
+        ):
+            with self.subTest(path=path):
+                self.assertTrue(path.startswith(tempfile.gettempdir()))
@@ -0,0 +1,96 @@
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import brotli
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import Http404
+from django.templatetags.static import static
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+
+from ..views import immutable_static_names, static_file
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    STATIC_ROOT=TEMP_STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+)
+class StaticPipelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        immutable_static_names.cache_clear()
+        self.addCleanup(immutable_static_names.cache_clear)
+        self.css = staticfiles_storage.stored_name('css/bootstrap.min.css')
+
+    def get(self, path, **headers):
+        request = RequestFactory().get('/static/' + path, **headers)
+        return static_file(request, path)
+
+    def test_templates_link_hashed_names(self):
+        self.assertRegex(self.css, r'^css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+        self.assertEqual(
+            static('css/bootstrap.min.css'), '/static/' + self.css
+        )
+
+    def test_hashed_file_cached_forever(self):
+        response = self.get(self.css)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_precompressed_variant(self):
+        with staticfiles_storage.open(self.css) as original:
+            content = original.read()
+        response = self.get(self.css, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(body, content)
+
+    def test_brotli_variant(self):
+        with staticfiles_storage.open(self.css) as original:
+            content = original.read()
+        response = self.get(self.css, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        body = brotli.decompress(b''.join(response.streaming_content))
+        self.assertEqual(body, content)
+
+    def test_unhashed_file_revalidated(self):
+        response = self.get('css/bootstrap.min.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_paths_outside_static_root(self):
+        for path in ('../manage.py', 'css/missing.css'):
+            with self.subTest(path=path):
+                with self.assertRaises(Http404):
+                    self.get(path)
+
+
+class StaticPipelineSettingsTests(SimpleTestCase):
+    def test_pipeline_refused_with_debug(self):
+        """С DEBUG ссылки без хэша, поэтому конвейер не включается."""
+        env = {**os.environ, 'STATIC_PIPELINE': '1', 'DEBUG': '1'}
+        result = subprocess.run(
+            [sys.executable, '-c', 'import yatube.settings'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('ImproperlyConfigured', result.stderr)
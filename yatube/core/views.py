@@ -1,4 +1,18 @@
+import mimetypes
+import os
+from functools import lru_cache
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from yatube.settings import STATIC_IMMUTABLE_MAX_AGE, STATIC_MAX_AGE
+
+# Сжатые копии статики в порядке предпочтения.
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
 
 
 def page_not_found(request, exception):
@@ -15,3 +29,61 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@lru_cache(maxsize=None)
+def immutable_static_names():
+    """Имена статики с хэшем содержимого из манифеста collectstatic."""
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    return frozenset(hashed_files.values())
+
+
+def accepted_encodings(request):
+    encodings = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = item.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+def static_file(request, path):
+    """Собранная статика: сжатая копия и заголовки кэша.
+
+    Файлы с хэшем в имени не меняются, браузер кэширует их бессрочно.
+    """
+    try:
+        full_path = staticfiles_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+    if not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime, stat.st_size
+    ):
+        return HttpResponseNotModified()
+    content_type, _ = mimetypes.guess_type(full_path)
+    accepted = accepted_encodings(request)
+    encoding = None
+    for name, suffix in STATIC_ENCODINGS:
+        if name in accepted and os.path.isfile(full_path + suffix):
+            full_path += suffix
+            encoding = name
+            break
+    response = FileResponse(
+        open(full_path, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+    )
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if path in immutable_static_names():
+        patch_cache_control(
+            response, public=True, max_age=STATIC_IMMUTABLE_MAX_AGE,
+            immutable=True,
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=STATIC_MAX_AGE)
+    return response
@@ -1,10 +1,29 @@
 from django.contrib import admin
 
+from . import search
 from .models import Comment, Follow, Group, Post
 
 
-class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
+class FullTextSearchMixin:
+    """Поиск в админке по полнотекстовому индексу вместо LIKE."""
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.split() or not search.available():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(
+            pk__in=search.matching(search_term, self.search_kind)
+        ), False
+
+
+class PostAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = search.POST
+    list_display = (
+        'pk', 'text', 'pub_date', 'author', 'group', 'comments_count',
+    )
+    readonly_fields = ('comments_count',)
     list_editable = ('group',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
@@ -17,7 +36,8 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = search.COMMENT
     list_display = ('post', 'author', 'text', 'pub_date')
     search_fields = ('text',)
     empty_value_display = '-пусто-'
@@ -0,0 +1,83 @@
+"""Счётчик ссылок постов на файлы картинок.
+
+Картинки хранятся по содержимому (``core.storage``), и один файл может
+быть у многих постов. Сигналы постов увеличивают счётчик файла новой
+картинки и уменьшают счётчик старой; файл и его миниатюры удаляются
+после коммита, когда ссылок не осталось. Файлы без счётчика не удаляются.
+
+Загрузка тех же байтов переиспользует файл раньше, чем пост с ней
+сохранён и увеличил счётчик. Поэтому файл моложе
+``IMAGE_BLOB_GRACE_SECONDS`` сразу не удаляется, а хранилище обновляет
+время изменения файла при каждом переиспользовании. Строка с нулевым
+счётчиком остаётся до удаления файла, и такие файлы позже удаляет
+периодическая команда ``sweep_images`` (``sweep``).
+"""
+import os
+import time
+
+from core.tasks import run_in_background
+from django.db import transaction
+from django.db.models import F
+from sorl.thumbnail import delete
+from sorl.thumbnail.images import ImageFile
+from yatube.settings import IMAGE_BLOB_GRACE_SECONDS
+
+from .models import ImageBlob, Post
+
+
+def acquire(name):
+    if not name:
+        return
+    with transaction.atomic():
+        updated = ImageBlob.objects.filter(name=name).update(
+            refs=F('refs') + 1
+        )
+        if not updated:
+            ImageBlob.objects.create(name=name, refs=1)
+
+
+def release(name):
+    if not name:
+        return
+    with transaction.atomic():
+        ImageBlob.objects.filter(name=name, refs__gt=0).update(
+            refs=F('refs') - 1
+        )
+        unused = ImageBlob.objects.filter(name=name, refs=0).exists()
+    if unused:
+        run_in_background(remove_file, name)
+
+
+def replace(old_name, new_name):
+    """Переносит ссылку поста со старой картинки на новую."""
+    if old_name != new_name:
+        acquire(new_name)
+        release(old_name)
+
+
+def remove_file(name):
+    """Удаляет файл и его миниатюры, если на него снова не сослались.
+
+    Возвращает ``True``, если файл удалён. Слишком молодой файл остаётся
+    вместе со строкой счётчика до следующего ``sweep``.
+    """
+    storage = Post._meta.get_field('image').storage
+    # Под блокировкой ``_save`` не переиспользует файл между проверкой
+    # и удалением.
+    with storage.lock(name):
+        path = storage.path(name)
+        if (
+            os.path.exists(path)
+            and time.time() - os.path.getmtime(path) < IMAGE_BLOB_GRACE_SECONDS
+        ):
+            return False
+        removed, _ = ImageBlob.objects.filter(name=name, refs=0).delete()
+        if removed:
+            delete(ImageFile(name, storage))
+        return bool(removed)
+
+
+def sweep():
+    """Удаляет файлы без ссылок, которые пропустил ``remove_file``."""
+    names = ImageBlob.objects.filter(refs=0).values_list('name', flat=True)
+    return sum(remove_file(name) for name in list(names))
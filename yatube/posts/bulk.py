@@ -0,0 +1,45 @@
+"""Массовое создание постов.
+
+``bulk_create`` не отправляет сигналы ``post_save``, поэтому всё, что для
+одного поста делают сигналы, здесь выполняется сразу для всей пачки:
+счётчики, рассылка в ленты, поисковый индекс, поколения кэша, миниатюры
+и события для потоков новых постов.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from . import blobs, caching, counters, events, feed, search, thumbnails
+from .models import Post, User
+
+
+def _assign_ids(posts):
+    # SQLite не возвращает id из пакетной вставки. Запись идёт внутри
+    # транзакции, которая держит блокировку базы на запись, поэтому
+    # последние id таблицы принадлежат только что вставленным строкам.
+    ids = Post.objects.order_by('-id').values_list('id', flat=True)
+    for post, pk in zip(posts, sorted(ids[:len(posts)])):
+        post.pk = pk
+
+
+def create_posts(posts):
+    """Сохраняет посты одной транзакцией и возвращает их с id."""
+    if not posts:
+        return posts
+    with transaction.atomic():
+        Post.objects.bulk_create(posts)
+        if posts[0].pk is None:
+            _assign_ids(posts)
+        authors = Counter(post.author_id for post in posts)
+        for author_id, count in authors.items():
+            counters.increment(User, author_id, 'posts_count', count)
+        feed.fan_out_many(posts)
+        events.publish_posts(posts)
+        search.index_posts(posts)
+        caching.bump(*caching.post_scopes(*posts))
+        for post in posts:
+            post._loaded_group_id = post.group_id
+            post._loaded_image = post.image.name or ''
+            blobs.acquire(post._loaded_image)
+            thumbnails.queue_thumbnails(post)
+    return posts
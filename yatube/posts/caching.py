@@ -0,0 +1,214 @@
+"""Кэширование страниц и карточек постов.
+
+Закэшированные страницы не удаляются при изменениях: в ключ страницы
+входят счётчики поколений её областей (все посты, посты группы), а запись
+поста увеличивает эти счётчики. Новые данные видны сразу, старые ключи
+вытесняются по таймауту.
+
+Кэш страниц у каждого процесса свой, а поколения общие: они хранятся
+в файле SQLite ``CACHE_GENERATIONS_DATABASE``, и запись в одном процессе
+сразу делает устаревшими страницы во всех. Поколение увеличивается
+при записи и ещё раз после коммита: страница, которую другой процесс
+успел собрать до коммита по старым данным, тоже становится устаревшей.
+
+Те же поколения служат валидаторами условных GET-запросов: ETag страницы
+считается из них без обращения к БД и без рендеринга.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from core import shared
+from core.routers import primary_reads
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from yatube.settings import (CACHE_GENERATIONS_DATABASE,
+                             NUMBER_VISIBLE_LINES_IN_POSTCARD,
+                             PAGE_CACHE_TIMEOUT)
+
+from .models import Group, User
+
+SCHEMA_SQL = (
+    'CREATE TABLE IF NOT EXISTS generation ('
+    'scope TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID'
+)
+
+CREATE_SQL = (
+    'INSERT INTO generation (scope, value) VALUES (?, ?) '
+    'ON CONFLICT (scope) DO NOTHING'
+)
+
+BUMP_SQL = (
+    'INSERT INTO generation (scope, value) VALUES (?, ?) '
+    'ON CONFLICT (scope) DO UPDATE SET value = value + 1'
+)
+
+SELECT_SQL = 'SELECT scope, value FROM generation WHERE scope IN ({})'
+
+
+def post_card_key(post):
+    """Ключ закэшированной карточки поста в ``post_list.html``."""
+    return make_template_fragment_key(
+        'post_card',
+        [post.id, post.version, NUMBER_VISIBLE_LINES_IN_POSTCARD],
+    )
+
+
+def _initial_generation():
+    # Начинаем со времени, а не с единицы: если файл поколений удалят,
+    # новые ключи не совпадут со старыми страницами в кэше процессов.
+    return int(time.time() * 1000)
+
+
+def _connection():
+    return shared.connection(CACHE_GENERATIONS_DATABASE, SCHEMA_SQL)
+
+
+def _select(connection, scopes):
+    return dict(connection.execute(
+        SELECT_SQL.format(', '.join(['?'] * len(scopes))), scopes
+    ).fetchall())
+
+
+def generations(*scopes):
+    """Текущие поколения областей кэша в порядке ``scopes``."""
+    if not scopes:
+        return []
+    connection = _connection()
+    values = _select(connection, scopes)
+    missing = [scope for scope in scopes if scope not in values]
+    if missing:
+        initial = _initial_generation()
+        connection.executemany(
+            CREATE_SQL, [(scope, initial) for scope in missing]
+        )
+        values.update(_select(connection, missing))
+    return [values[scope] for scope in scopes]
+
+
+def _bump(scopes):
+    initial = _initial_generation()
+    _connection().executemany(BUMP_SQL, [(scope, initial) for scope in scopes])
+
+
+def bump(*scopes):
+    """Увеличивает поколения областей, делая их страницы устаревшими."""
+    if not scopes:
+        return
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def comments_scope(post_id):
+    return f'comments:{post_id}'
+
+
+def author_scopes(*user_ids):
+    """Области страниц профилей пользователей с указанными id."""
+    usernames = User.objects.filter(pk__in=user_ids).values_list(
+        'username', flat=True
+    )
+    return [author_scope(username) for username in usernames]
+
+
+def post_scopes(*posts):
+    """Области кэша, которые затрагивает изменение постов."""
+    group_ids = set()
+    for post in posts:
+        group_ids |= {post.group_id, getattr(post, '_loaded_group_id', None)}
+    group_ids.discard(None)
+    slugs = []
+    if group_ids:
+        slugs = Group.objects.filter(pk__in=group_ids).values_list(
+            'slug', flat=True
+        )
+    return (
+        ['all']
+        + [group_scope(slug) for slug in slugs]
+        + author_scopes(*{post.author_id for post in posts})
+    )
+
+
+def etag(request, *scopes, vary=()):
+    """ETag ответа: поколения областей, пользователь и адрес запроса.
+
+    ``vary`` — дополнительные значения, от которых зависит ответ,
+    например формат рендеринга в API.
+    """
+    parts = [request.get_full_path(), request.user.pk, *vary]
+    parts += generations(*scopes)
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def conditional_response(request, etag, render):
+    """304 Not Modified, если у клиента актуальная версия, иначе ``render()``.
+
+    ETag ставится только успешным ответам: у страницы 404 нет областей,
+    изменение которых сбросило бы валидатор. Ответ читается из основной
+    базы: на реплике может ещё не быть записи, которая сменила поколение.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        with primary_reads():
+            response = render()
+        if response.status_code == 200:
+            response['ETag'] = etag
+    return response
+
+
+def conditional_page(*scopes):
+    """Отвечает на повторный GET кодом 304, пока области не изменились.
+
+    ``scopes`` задаются так же, как в ``cache_anonymous_page``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            names = [scope.format(**kwargs) for scope in scopes]
+            return conditional_response(
+                request,
+                etag(request, *names),
+                lambda: view(request, *args, **kwargs),
+            )
+        return wrapper
+    return decorator
+
+
+def cache_anonymous_page(*scopes):
+    """Кэширует ответ view для анонимных пользователей.
+
+    ``scopes`` — области, от которых зависит страница; в них можно
+    подставлять аргументы view, например ``'group:{slug}'``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            names = [scope.format(**kwargs) for scope in scopes]
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = 'posts:page:{}:{}'.format(
+                path, ':'.join(map(str, generations(*names)))
+            )
+            response = cache.get(key)
+            if response is None:
+                with primary_reads():
+                    response = view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    cache.set(key, response, PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,57 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются атомарно выражениями ``F()`` из сигналов создания и
+удаления, поэтому их поддерживают и сайт, и API, и админка. Команда
+``recount_counters`` пересчитывает их и сообщает о расхождениях.
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, User
+
+# Счётчик: (модель, поле счётчика, модель строк, поле связи).
+COUNTERS = (
+    (User, 'posts_count', Post, 'author'),
+    (User, 'followers_count', Follow, 'author'),
+    (User, 'following_count', Follow, 'user'),
+    (Post, 'comments_count', Comment, 'post'),
+)
+
+
+def increment(model, pk, field, delta=1):
+    """Изменяет счётчик на ``delta``, не опуская его ниже нуля."""
+    objects = model.objects.filter(pk=pk)
+    if delta < 0:
+        objects = objects.filter(**{f'{field}__gte': -delta})
+    objects.update(**{field: F(field) + delta})
+
+
+def actual_counts(model, field, rows_model, relation):
+    """Queryset объектов с фактическим значением счётчика в ``actual``."""
+    counts = (
+        rows_model.objects.filter(**{relation: OuterRef('pk')})
+        .order_by()
+        .values(relation)
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return model.objects.annotate(actual=Coalesce(Subquery(counts), 0))
+
+
+def recount(fix=True):
+    """Находит расхождения счётчиков и, если ``fix``, исправляет их.
+
+    Возвращает словарь ``{поле: [(pk, хранимое, фактическое), ...]}``.
+    """
+    drift = {}
+    for model, field, rows_model, relation in COUNTERS:
+        wrong = actual_counts(model, field, rows_model, relation).exclude(
+            **{field: F('actual')}
+        )
+        rows = list(wrong.values_list('pk', field, 'actual'))
+        drift[f'{model.__name__}.{field}'] = rows
+        if not fix:
+            continue
+        for pk, _, actual in rows:
+            model.objects.filter(pk=pk).update(**{field: actual})
+    return drift
@@ -0,0 +1,157 @@
+"""Поток новых постов для страниц группы и подписок (Server-Sent Events).
+
+Источник событий — сама таблица постов: поток отдаёт посты с id больше
+последнего отправленного, поэтому после обрыва браузер продолжает
+с ``Last-Event-ID`` без пропусков. Брокер в памяти процесса только будит
+потоки подписчиков после коммита нового поста, и база опрашивается,
+лишь когда пост действительно появился.
+
+Брокер не видит посты, созданные в других процессах. Пока общей
+шины нет, ``EVENTS_BACKEND=polling`` заменяет её опросом базы
+раз в ``EVENTS_POLL_SECONDS``: так поток работает при любом числе
+процессов.
+
+Каждый открытый поток занимает поток WSGI-сервера, поэтому поток
+закрывается через ``EVENTS_MAX_SECONDS``, и браузер переподключается.
+По той же причине потоки включает только ``EVENTS_LIVE``, и подписываются
+на них лишь страницы вошедших пользователей.
+"""
+import json
+import threading
+import time
+
+from django.db import transaction
+from django.db.models import Max
+from django.template.loader import render_to_string
+from yatube.settings import (EVENTS_BACKEND, EVENTS_BATCH_SIZE,
+                             EVENTS_HEARTBEAT_SECONDS, EVENTS_MAX_SECONDS,
+                             EVENTS_POLL_SECONDS, EVENTS_RETRY_MS,
+                             NUMBER_VISIBLE_LINES_IN_POSTCARD)
+
+from .models import Post
+
+
+def group_channel(group_id):
+    return f'group:{group_id}'
+
+
+def author_channel(author_id):
+    return f'author:{author_id}'
+
+
+class Subscription:
+    def __init__(self, channels):
+        self.channels = channels
+        self.event = threading.Event()
+
+    def wait(self, timeout):
+        """Ждёт публикации в каналах; ``False`` — вышло время."""
+        woke = self.event.wait(timeout)
+        self.event.clear()
+        return woke
+
+
+class Broker:
+    """Публикация и подписка внутри процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def subscribe(self, channels):
+        subscription = Subscription(tuple(channels))
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel, set())
+                subscribers.discard(subscription)
+                if not subscribers:
+                    self._channels.pop(channel, None)
+
+    def publish(self, *channels):
+        with self._lock:
+            subscriptions = set().union(
+                *(self._channels.get(channel, ()) for channel in channels)
+            )
+        for subscription in subscriptions:
+            subscription.event.set()
+
+
+broker = Broker()
+
+
+def post_channels(post):
+    channels = [author_channel(post.author_id)]
+    if post.group_id:
+        channels.append(group_channel(post.group_id))
+    return channels
+
+
+def publish_posts(posts):
+    """Будит подписчиков новых постов после коммита транзакции."""
+    channels = {
+        channel for post in posts for channel in post_channels(post)
+    }
+    transaction.on_commit(lambda: broker.publish(*channels))
+
+
+def last_post_id():
+    return Post.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def _event(post):
+    html = render_to_string('posts/includes/post_list.html', {
+        'post': post,
+        'visible_lines': NUMBER_VISIBLE_LINES_IN_POSTCARD,
+    })
+    data = json.dumps({'id': post.id, 'html': html}, ensure_ascii=False)
+    return f'id: {post.id}\nevent: post\ndata: {data}\n\n'
+
+
+def stream(channels, last_id, **filters):
+    """События ``post`` для постов с id больше ``last_id``.
+
+    ``filters`` ограничивают посты так же, как каналы ``channels``.
+    Пока новых постов нет, каждые ``EVENTS_HEARTBEAT_SECONDS``
+    отправляется комментарий, чтобы прокси не закрывали соединение.
+    """
+    polling = EVENTS_BACKEND == 'polling'
+    subscription = broker.subscribe(channels)
+    try:
+        yield f'retry: {EVENTS_RETRY_MS}\n\n'
+        deadline = time.monotonic() + EVENTS_MAX_SECONDS
+        sent = time.monotonic()
+        check = True
+        while True:
+            if check:
+                # Посты новее отправленных, по возрастанию id: браузер
+                # добавляет каждую карточку в начало списка.
+                posts = list(
+                    Post.objects.filter(pk__gt=last_id, **filters)
+                    .select_related('author', 'group')
+                    .order_by('pk')[:EVENTS_BATCH_SIZE]
+                )
+                if posts:
+                    yield ''.join(_event(post) for post in posts)
+                    last_id = posts[-1].pk
+                    sent = time.monotonic()
+                    if len(posts) == EVENTS_BATCH_SIZE:
+                        continue
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now - sent >= EVENTS_HEARTBEAT_SECONDS:
+                yield ': ping\n\n'
+                sent = now
+            timeout = min(
+                EVENTS_POLL_SECONDS if polling else EVENTS_HEARTBEAT_SECONDS,
+                deadline - now,
+            )
+            check = subscription.wait(timeout) or polling
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,220 @@
+"""Лента подписок с рассылкой постов при записи (fan-out-on-write).
+
+Новый пост сразу раскладывается по лентам подписчиков автора, поэтому
+страница подписок читает готовый отсортированный срез ``FeedEntry``.
+Посты авторов с очень большим числом подписчиков не рассылаются:
+их подмешивают в ленту при чтении (fan-out-on-read). Такие авторы
+отмечены ``User.feed_fan_in``; отметка снимается только после того,
+как пропущенные посты разосланы (``stop_fan_in``), поэтому посты,
+опубликованные без рассылки, не пропадают из лент.
+"""
+import heapq
+
+from django.db import connection, transaction
+from django.db.models import F
+from yatube.settings import (FEED_BACKFILL_LIMIT, FEED_BATCH_SIZE,
+                             FEED_FANOUT_MAX_FOLLOWERS)
+
+from .models import FeedEntry, Follow, Post, User
+
+# Последние ``FEED_BACKFILL_LIMIT`` постов каждого автора из ``authors``
+# в ленты его подписчиков; записи, которые уже есть, пропускаются.
+FILL_SQL = (
+    'INSERT INTO {feed} (user_id, post_id, author_id, pub_date) '
+    'SELECT follow.user_id, post.id, post.author_id, post.pub_date '
+    'FROM {follow} follow JOIN ('
+    'SELECT id, author_id, pub_date, ROW_NUMBER() OVER ('
+    'PARTITION BY author_id ORDER BY pub_date DESC, id DESC) AS position '
+    'FROM {post} WHERE {authors}) post '
+    'ON post.author_id = follow.author_id '
+    'WHERE post.position <= %s '
+    'ON CONFLICT DO NOTHING'
+)
+
+
+def _fill(authors, params):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            FILL_SQL.format(
+                feed=FeedEntry._meta.db_table,
+                follow=Follow._meta.db_table,
+                post=Post._meta.db_table,
+                authors=authors,
+            ),
+            [*params, FEED_BACKFILL_LIMIT],
+        )
+
+
+def fan_out(post):
+    """Рассылает новый пост в ленты подписчиков автора."""
+    fan_out_many([post])
+
+
+def fan_out_many(posts):
+    """Рассылает пачку новых постов: подписчики читаются раз на автора."""
+    by_author = {}
+    for post in posts:
+        by_author.setdefault(post.author_id, []).append(post)
+    heavy = set(
+        User.objects.filter(
+            pk__in=by_author, followers_count__gt=FEED_FANOUT_MAX_FOLLOWERS
+        ).values_list('id', flat=True)
+    )
+    if heavy:
+        User.objects.filter(pk__in=heavy, feed_fan_in=False).update(
+            feed_fan_in=True
+        )
+    for author_id, author_posts in by_author.items():
+        if author_id in heavy:
+            continue
+        followers = list(
+            Follow.objects.filter(author_id=author_id)
+            .values_list('user_id', flat=True)
+        )
+        FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(
+                    user_id=user_id,
+                    post_id=post.id,
+                    author_id=author_id,
+                    pub_date=post.pub_date,
+                )
+                for post in author_posts
+                for user_id in followers
+            ),
+            batch_size=FEED_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика последние посты нового автора."""
+    if User.objects.filter(pk=author_id, feed_fan_in=True).exists():
+        return
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date'
+    )[:FEED_BACKFILL_LIMIT]
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user_id=user_id,
+                post_id=post_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for post_id, pub_date in posts
+        ),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def prune(user_id, author_id):
+    """Убирает из ленты подписчика посты автора, от которого он отписался."""
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def stop_fan_in(author_id):
+    """Возвращает рассылку автору, у которого стало мало подписчиков.
+
+    Посты, опубликованные без рассылки, раскладываются по лентам
+    подписчиков, и только после этого лента перестаёт читать их при чтении.
+    """
+    authors = User.objects.filter(
+        pk=author_id,
+        feed_fan_in=True,
+        followers_count__lte=FEED_FANOUT_MAX_FOLLOWERS,
+    )
+    if not authors.exists():
+        return
+    with transaction.atomic():
+        _fill('author_id = %s', [author_id])
+        authors.update(feed_fan_in=False)
+
+
+def rebuild():
+    """Собирает ленты всех подписчиков заново одним запросом."""
+    with transaction.atomic():
+        User.objects.filter(
+            followers_count__gt=FEED_FANOUT_MAX_FOLLOWERS
+        ).update(feed_fan_in=True)
+        User.objects.filter(
+            followers_count__lte=FEED_FANOUT_MAX_FOLLOWERS
+        ).update(feed_fan_in=False)
+        FeedEntry.objects.all().delete()
+        _fill(
+            'author_id IN (SELECT id FROM {} WHERE NOT feed_fan_in)'.format(
+                User._meta.db_table
+            ),
+            [],
+        )
+
+
+class MergedFeed:
+    """Несколько срезов ленты, слитых в один порядок ``FeedEntry``.
+
+    Для ``KeysetPaginator`` ведёт себя как queryset записей ленты:
+    условие и сортировка применяются к каждому срезу, а срез
+    ``[start:stop]`` читает из каждого не больше ``stop`` строк по индексу
+    и сливает их. Посты авторов без рассылки получают ``post_id``,
+    чтобы ключ сортировки у всех строк был общим.
+    """
+    model = FeedEntry
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.query = parts[0].query
+
+    def filter(self, *args, **kwargs):
+        return MergedFeed(
+            [part.filter(*args, **kwargs) for part in self.parts]
+        )
+
+    def order_by(self, *fields):
+        return MergedFeed([part.order_by(*fields) for part in self.parts])
+
+    def __getitem__(self, index):
+        ordering = self.query.order_by or FeedEntry._meta.ordering
+        descending = ordering[0].startswith('-')
+        rows = heapq.merge(
+            *(part[:index.stop] for part in self.parts),
+            key=lambda row: (row.pub_date, row.post_id),
+            reverse=descending,
+        )
+        return list(rows)[index]
+
+
+def get_feed(user):
+    """Лента пользователя.
+
+    Обычно это записи ``FeedEntry`` в порядке публикации. Посты авторов
+    без рассылки, на которых он подписан, читаются при чтении из индекса
+    постов автора и сливаются с записями ленты (``MergedFeed``).
+    """
+    heavy_followed = list(
+        Follow.objects.filter(user=user, author__feed_fan_in=True)
+        .values_list('author_id', flat=True)
+    )
+    entries = FeedEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    )
+    if not heavy_followed:
+        return entries
+    # Записи ленты у таких авторов могли остаться с тех пор, когда
+    # рассылка ещё шла: их посты берутся только из индекса автора.
+    parts = [entries.exclude(author_id__in=heavy_followed)]
+    for author_id in heavy_followed:
+        parts.append(
+            Post.objects.filter(author_id=author_id)
+            .annotate(post_id=F('id'))
+            .select_related('author', 'group')
+            .order_by('-pub_date', '-post_id')
+        )
+    return MergedFeed(parts)
+
+
+def as_posts(objects):
+    """Приводит элементы страницы ленты к списку постов."""
+    return [
+        obj.post if isinstance(obj, FeedEntry) else obj for obj in objects
+    ]
@@ -6,7 +6,7 @@ from .models import Comment, Post
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
-        fields = ('text', 'image',)
+        fields = ('text', 'group', 'image',)
 
 
 class CommentForm(forms.ModelForm):
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Убирает из рейтинга популярных посты с затухшим весом. '
+        'Запускается периодически, например раз в час.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Собрать рейтинг заново по комментариям и подпискам.',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            trending.rebuild()
+            self.stdout.write(self.style.SUCCESS('Рейтинг собран заново.'))
+            return
+        deleted = trending.decay()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено затухших постов: {deleted}.'
+        ))
@@ -0,0 +1,80 @@
+import json
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts import suggestions
+from posts.models import Follow, FollowSuggestion, User
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации подписок всех пользователей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--benchmark',
+            help=(
+                'Размеры графа через запятую, например 1000,5000,20000: '
+                'для каждого seed_data создаёт столько пользователей '
+                'в откатываемой транзакции и замеряется пересчёт.'
+            ),
+        )
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя для --benchmark.',
+        )
+        parser.add_argument(
+            '--output', help='Файл для результатов --benchmark.',
+        )
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self.benchmark(
+                [int(size) for size in options['benchmark'].split(',')],
+                options['follows'],
+                options['output'],
+            )
+            return
+        result = self.measure()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рекомендации пересчитаны за {result["seconds"]} с: '
+            f'пользователей {result["users"]}, подписок {result["follows"]}, '
+            f'рекомендаций {result["suggestions"]}.'
+        ))
+
+    @staticmethod
+    def measure():
+        start = time.perf_counter()
+        suggestions.rebuild()
+        seconds = time.perf_counter() - start
+        return {
+            'users': User.objects.count(),
+            'follows': Follow.objects.count(),
+            'suggestions': FollowSuggestion.objects.count(),
+            'seconds': round(seconds, 3),
+        }
+
+    def benchmark(self, sizes, follows, output):
+        runs = []
+        for size in sizes:
+            with transaction.atomic():
+                call_command(
+                    'seed_data', users=size, groups=0, posts=0, comments=0,
+                    follows=follows, stdout=StringIO(),
+                )
+                runs.append(self.measure())
+                transaction.set_rollback(True)
+        report = json.dumps({
+            'started': timezone.now().isoformat(),
+            'follows_per_user': follows,
+            'runs': runs,
+        }, ensure_ascii=False, indent=2)
+        if output:
+            with open(output, 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.counters import recount
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, комментариев и подписок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только сообщить о расхождениях, ничего не меняя.',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drift = recount(fix=not options['dry_run'])
+        total = 0
+        for counter, rows in drift.items():
+            total += len(rows)
+            self.stdout.write(f'{counter}: расхождений {len(rows)}')
+            for pk, stored, actual in rows[:10]:
+                self.stdout.write(f'  pk={pk}: {stored} -> {actual}')
+        if options['dry_run'] or not total:
+            return
+        self.stdout.write(self.style.SUCCESS(f'Исправлено: {total}'))
@@ -0,0 +1,186 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from posts import counters, feed, search, suggestions, trending
+from posts.models import Comment, Follow, Group, Post, User
+
+PASSWORD = 'seed-password'
+
+
+@contextmanager
+def explicit_pub_date(*models):
+    """Позволяет сохранить свою дату публикации вместо ``auto_now_add``."""
+    fields = [model._meta.get_field('pub_date') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def create(model, objects):
+    """Вставляет объекты пачками и возвращает id новых строк по порядку."""
+    last_id = model.objects.aggregate(last=Max('id'))['last'] or 0
+    model.objects.bulk_create(objects)
+    return list(
+        model.objects.filter(id__gt=last_id)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу правдоподобными данными: у немногих авторов '
+        'большинство постов, комментариев и подписчиков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=30000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя.',
+        )
+        parser.add_argument(
+            '--popular', type=int, default=3,
+            help='Авторы, на которых подписана большая часть пользователей.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределены даты публикаций.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.now = timezone.now()
+        self.period = timedelta(days=options['days'])
+
+        with transaction.atomic(), explicit_pub_date(Post, Comment):
+            users = self.create_users(options['users'])
+            # Вес автора убывает по закону Ципфа: несколько авторов пишут
+            # и собирают подписчиков больше, чем все остальные вместе.
+            weights = [1 / rank ** 1.1 for rank in range(1, len(users) + 1)]
+            groups = self.create_groups(options['groups'])
+            posts = self.create_posts(
+                options['posts'], users, weights, groups
+            )
+            self.create_comments(options['comments'], users, posts)
+            self.create_follows(
+                options['follows'], options['popular'], users, weights
+            )
+            counters.recount(fix=True)
+            feed.rebuild()
+            suggestions.rebuild()
+            trending.rebuild()
+            if search.available():
+                search.rebuild()
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, групп {len(groups)}, '
+            f'постов {len(posts)}, комментариев {options["comments"]}. '
+            f'Пароль пользователей: {PASSWORD}'
+        ))
+
+    def random_date(self, since=None):
+        since = since or self.now - self.period
+        span = (self.now - since).total_seconds()
+        return since + timedelta(seconds=self.random.uniform(0, span))
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        start = User.objects.aggregate(last=Max('id'))['last'] or 0
+        ids = create(User, [
+            User(
+                username=f'{self.fake.user_name()}{start + i}'[:150],
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                email=self.fake.email(),
+                password=password,
+            )
+            for i in range(1, count + 1)
+        ])
+        self.random.shuffle(ids)
+        return ids
+
+    def create_groups(self, count):
+        start = Group.objects.aggregate(last=Max('id'))['last'] or 0
+        return create(Group, [
+            Group(
+                title=self.fake.sentence(nb_words=3)[:200],
+                slug=f'group-{start + i}',
+                description=self.fake.paragraph(),
+            )
+            for i in range(1, count + 1)
+        ])
+
+    def create_posts(self, count, users, weights, groups):
+        authors = self.random.choices(users, weights, k=count)
+        posts = [
+            Post(
+                text=self.fake.paragraph(
+                    nb_sentences=self.random.randint(1, 12)
+                ),
+                author_id=author_id,
+                group_id=(
+                    self.random.choice(groups)
+                    if groups and self.random.random() < 0.7 else None
+                ),
+                pub_date=self.random_date(),
+            )
+            for author_id in authors
+        ]
+        ids = create(Post, posts)
+        for post, pk in zip(posts, ids):
+            post.pk = pk
+        return posts
+
+    def create_comments(self, count, users, posts):
+        if not posts:
+            return
+        # Обсуждают в основном посты популярных авторов.
+        rank = {author_id: i for i, author_id in enumerate(users, 1)}
+        weights = [1 / rank[post.author_id] for post in posts]
+        create(Comment, [
+            Comment(
+                post_id=post.pk,
+                author_id=self.random.choice(users),
+                text=self.fake.sentence(
+                    nb_words=self.random.randint(3, 30)
+                ),
+                pub_date=self.random_date(since=post.pub_date),
+            )
+            for post in self.random.choices(posts, weights, k=count)
+        ])
+
+    def create_follows(self, average, popular, users, weights):
+        pairs = set()
+        for author_id in users[:popular]:
+            for user_id in users:
+                if user_id != author_id and self.random.random() < 0.6:
+                    pairs.add((user_id, author_id))
+        for user_id in users:
+            count = self.random.randint(0, 2 * average)
+            for author_id in self.random.choices(users, weights, k=count):
+                if author_id != user_id:
+                    pairs.add((user_id, author_id))
+        create(Follow, [
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in pairs
+        ])
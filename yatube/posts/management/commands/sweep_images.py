@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts import blobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы картинок, на которые не осталось ссылок. '
+        'Запускается периодически, например раз в час.'
+    )
+
+    def handle(self, *args, **options):
+        removed = blobs.sweep()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено файлов картинок: {removed}.'
+        ))
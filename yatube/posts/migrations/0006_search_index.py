@@ -0,0 +1,39 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:16
+
+from django.db import migrations
+
+TABLE = 'posts_search'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+        'text, kind UNINDEXED, object_id UNINDEXED, post_id UNINDEXED, '
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'INSERT INTO {TABLE} (rowid, text, kind, object_id, post_id) '
+        "SELECT id * 2, text, 'post', id, id FROM posts_post"
+    )
+    schema_editor.execute(
+        f'INSERT INTO {TABLE} (rowid, text, kind, object_id, post_id) '
+        "SELECT id * 2 + 1, text, 'comment', id, post_id FROM posts_comment"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
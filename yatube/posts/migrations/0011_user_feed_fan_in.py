@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:58
+
+from django.db import migrations, models
+from yatube.settings import FEED_FANOUT_MAX_FOLLOWERS
+
+
+def mark_fan_in(apps, schema_editor):
+    # Посты этих авторов не рассылались и до сих пор читались при чтении.
+    User = apps.get_model('posts', 'User')
+    User.objects.filter(
+        followers_count__gt=FEED_FANOUT_MAX_FOLLOWERS
+    ).update(feed_fan_in=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_image_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='feed_fan_in',
+            field=models.BooleanField(default=False, help_text='Посты подмешиваются в ленты подписчиков при чтении', verbose_name='Посты без рассылки'),
+        ),
+        migrations.RunPython(mark_fan_in, migrations.RunPython.noop),
+    ]
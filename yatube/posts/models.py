@@ -1,10 +1,20 @@
 from core.models import CreatedModel
+from core.storage import ContentAddressedStorage
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
 
 class User(AbstractUser):
-    pass
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        'Число подписчиков', default=0, db_index=True
+    )
+    following_count = models.PositiveIntegerField('Число подписок', default=0)
+    feed_fan_in = models.BooleanField(
+        'Посты без рассылки',
+        default=False,
+        help_text='Посты подмешиваются в ленты подписчиков при чтении',
+    )
 
 
 class Post(CreatedModel):
@@ -16,6 +26,7 @@ class Post(CreatedModel):
         'User',
         on_delete=models.CASCADE,
         related_name='posts',
+        db_index=False,
         verbose_name='Пользователь',
     )
     group = models.ForeignKey(
@@ -23,20 +34,50 @@ class Post(CreatedModel):
         blank=True,
         null=True,
         on_delete=models.SET_NULL,
+        db_index=False,
         verbose_name='Группа',
         help_text='Укажите группу поста',
     )
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        'Число комментариев', default=0
+    )
+    version = models.PositiveIntegerField(
+        'Версия',
+        default=1,
+        editable=False,
+        help_text='Меняется при каждом изменении поста',
+    )
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Группа и картинка на момент загрузки: при их смене нужно сбросить
+        # кэш страниц старой группы и подготовить миниатюры новой картинки.
+        instance._loaded_group_id = instance.__dict__.get('group_id')
+        instance._loaded_image = str(instance.__dict__.get('image') or '')
+        return instance
+
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -53,6 +94,9 @@ class Group(models.Model):
         help_text='Введите описание группы',
     )
 
+    class Meta:
+        ordering = ['id']
+
     def __str__(self):
         return self.title
 
@@ -62,6 +106,7 @@ class Comment(CreatedModel):
         'Post',
         on_delete=models.CASCADE,
         related_name='comments',
+        db_index=False,
         verbose_name='Пост',
     )
     author = models.ForeignKey(
@@ -76,7 +121,13 @@ class Comment(CreatedModel):
     )
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['post', '-pub_date', '-id'],
+                name='comment_post_pub_date_idx',
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -84,6 +135,7 @@ class Follow(models.Model):
         'User',
         related_name='follower',
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Подписавшийся пользователь',
     )
     author = models.ForeignKey(
@@ -92,3 +144,115 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Пользователь на которого подписались',
     )
+    # Пусто у подписок, оформленных до появления поля.
+    created = models.DateTimeField(
+        'Дата подписки', auto_now_add=True, null=True
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='follow_unique_user_author'
+            ),
+        ]
+
+
+class FeedEntry(models.Model):
+    """Запись ленты подписок: пост автора, разосланный подписчику."""
+    user = models.ForeignKey(
+        'User',
+        related_name='feed_entries',
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name='Подписчик',
+    )
+    post = models.ForeignKey(
+        'Post',
+        related_name='feed_entries',
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+    )
+    author = models.ForeignKey(
+        'User',
+        related_name='+',
+        on_delete=models.CASCADE,
+        verbose_name='Автор поста',
+    )
+    pub_date = models.DateTimeField('Дата создания поста')
+
+    class Meta:
+        ordering = ['-pub_date', '-post_id']
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='feed_user_pub_date_idx',
+            ),
+            models.Index(
+                fields=['user', 'author'], name='feed_user_author_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='feed_unique_user_post'
+            ),
+        ]
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+
+
+class FollowSuggestion(models.Model):
+    """Рекомендуемый автор: на него подписаны подписки пользователя."""
+    user = models.ForeignKey(
+        'User',
+        related_name='follow_suggestions',
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name='Пользователь',
+    )
+    author = models.ForeignKey(
+        'User',
+        related_name='+',
+        on_delete=models.CASCADE,
+        verbose_name='Рекомендуемый автор',
+    )
+    score = models.PositiveIntegerField('Общих подписок')
+
+    class Meta:
+        ordering = ['-score', 'author_id']
+        indexes = [
+            models.Index(
+                fields=['user', '-score', 'author'],
+                name='suggestion_user_score_idx',
+            ),
+        ]
+        verbose_name = 'Рекомендация подписки'
+        verbose_name_plural = 'Рекомендации подписок'
+
+
+class TrendingPost(models.Model):
+    """Вес поста в рейтинге популярного, см. ``posts.trending``."""
+    post = models.OneToOneField(
+        'Post',
+        primary_key=True,
+        related_name='trending',
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+    )
+    score = models.FloatField('Вес на момент обновления')
+    updated = models.DateTimeField('Обновлён')
+    rank = models.FloatField('Ранг', db_index=True)
+
+    class Meta:
+        ordering = ['-rank', '-post_id']
+        verbose_name = 'Популярный пост'
+        verbose_name_plural = 'Популярные посты'
+
+
+class ImageBlob(models.Model):
+    """Файл картинки в хранилище по содержимому и число ссылок на него."""
+    name = models.CharField('Имя файла', max_length=100, primary_key=True)
+    refs = models.PositiveIntegerField('Число ссылок', default=0)
+
+    class Meta:
+        verbose_name = 'Файл картинки'
+        verbose_name_plural = 'Файлы картинок'
@@ -0,0 +1,194 @@
+"""Полнотекстовый поиск по постам и комментариям (SQLite FTS5).
+
+Тексты хранятся в виртуальной таблице ``posts_search``. ``rowid`` строки
+вычисляется из типа и id объекта, поэтому обновление и удаление из
+индекса — поиск по ключу, а не перебор таблицы. Индекс поддерживают
+сигналы сохранения и удаления, команда ``rebuild_search_index``
+перестраивает его целиком.
+"""
+import base64
+import json
+
+from django.db import connection, connections, router
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+TABLE = 'posts_search'
+POST = 'post'
+COMMENT = 'comment'
+KINDS = (POST, COMMENT)
+
+INSERT_SQL = (
+    f'INSERT INTO {TABLE} (rowid, text, kind, object_id, post_id) '
+)
+
+
+def available():
+    """Поиск работает только на SQLite."""
+    return connection.vendor == 'sqlite'
+
+
+def _rowid(kind, object_id):
+    return object_id * len(KINDS) + KINDS.index(kind)
+
+
+def _index(kind, object_id, post_id, text):
+    if not available():
+        return
+    rowid = _rowid(kind, object_id)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [rowid])
+        cursor.execute(
+            INSERT_SQL + 'VALUES (%s, %s, %s, %s, %s)',
+            [rowid, text, kind, object_id, post_id],
+        )
+
+
+def _remove(kind, object_id):
+    if not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {TABLE} WHERE rowid = %s',
+            [_rowid(kind, object_id)],
+        )
+
+
+def index_post(post):
+    _index(POST, post.id, post.id, post.text)
+
+
+def index_posts(posts):
+    """Добавляет в индекс пачку новых постов одним запросом."""
+    if not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            INSERT_SQL + 'VALUES (%s, %s, %s, %s, %s)',
+            [
+                (_rowid(POST, post.id), post.text, POST, post.id, post.id)
+                for post in posts
+            ],
+        )
+
+
+def index_comment(comment):
+    _index(COMMENT, comment.id, comment.post_id, comment.text)
+
+
+def remove_post(post):
+    _remove(POST, post.id)
+
+
+def remove_comment(comment):
+    _remove(COMMENT, comment.id)
+
+
+def rebuild():
+    """Заполняет индекс заново из таблиц постов и комментариев."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        for kind, table, post_column in (
+            (POST, 'posts_post', 'id'),
+            (COMMENT, 'posts_comment', 'post_id'),
+        ):
+            cursor.execute(
+                INSERT_SQL + f'SELECT id * %s + %s, text, %s, id, '
+                f'{post_column} FROM {table}',
+                [len(KINDS), KINDS.index(kind), kind],
+            )
+
+
+def _match_expression(query):
+    # Каждое слово берём в кавычки, чтобы пользовательский ввод
+    # не разбирался как синтаксис запросов FTS5.
+    words = query.split()
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def encode_cursor(hit):
+    return base64.urlsafe_b64encode(
+        json.dumps([hit['score'], hit['rowid']]).encode()
+    ).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        score, rowid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(rowid)
+    except (ValueError, TypeError):
+        return None
+
+
+def _ranked(select, params, limit, after):
+    """Страница строк ``select`` (поля ``score`` и ``rowid``) по курсору."""
+    sql = f'SELECT * FROM ({select})'
+    params = list(params)
+    position = decode_cursor(after) if after else None
+    if position is not None:
+        sql += ' WHERE score > %s OR (score = %s AND rowid > %s)'
+        params += [position[0], position[0], position[1]]
+    sql += ' ORDER BY score, rowid LIMIT %s'
+    params.append(limit + 1)
+    # Поиск только читает индекс, поэтому может идти на реплику.
+    with connections[router.db_for_read(Post)].cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        hits = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_cursor(hits[-1])
+    return hits, next_cursor
+
+
+def search(query, limit, after=None, kind=None):
+    """Находит посты и комментарии по запросу, лучшие совпадения первыми.
+
+    Возвращает ``(hits, next_cursor)``; ``hits`` — словари с полями
+    ``kind``, ``object_id``, ``post_id``, ``text``, ``score``, ``rowid``.
+    ``kind`` оставляет только посты или только комментарии.
+    """
+    expression = _match_expression(query)
+    if not expression or not available():
+        return [], None
+    select = (
+        'SELECT rowid, kind, object_id, post_id, text, '
+        f'bm25({TABLE}) AS score FROM {TABLE} WHERE {TABLE} MATCH %s'
+    )
+    params = [expression]
+    if kind is not None:
+        select += ' AND kind = %s'
+        params.append(kind)
+    return _ranked(select, params, limit, after)
+
+
+def search_posts(query, limit, after=None):
+    """Посты, найденные по своему тексту или комментариям, без повторов.
+
+    Совпадения группируются по посту, пост ранжируется по лучшему из них.
+    ``hits`` — словари с полями ``post_id``, ``score`` и ``rowid``.
+    """
+    expression = _match_expression(query)
+    if not expression or not available():
+        return [], None
+    # bm25() нельзя вызывать внутри агрегата: совпадения сначала
+    # материализуются, а потом группируются.
+    select = (
+        'WITH matches AS MATERIALIZED ('
+        f'SELECT post_id, bm25({TABLE}) AS score FROM {TABLE} '
+        f'WHERE {TABLE} MATCH %s) '
+        'SELECT post_id AS rowid, post_id, MIN(score) AS score '
+        'FROM matches GROUP BY post_id'
+    )
+    return _ranked(select, [expression], limit, after)
+
+
+def matching(query, kind):
+    """Подзапрос id всех объектов вида ``kind`` для фильтра ``pk__in``."""
+    return RawSQL(
+        f'SELECT object_id FROM {TABLE} WHERE {TABLE} MATCH %s '
+        'AND kind = %s',
+        [_match_expression(query), kind],
+    )
@@ -0,0 +1,146 @@
+from core.tasks import run_in_background
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import (blobs, caching, counters, events, feed, search, suggestions,
+               thumbnails, trending)
+from .models import Comment, Follow, Group, Post, User
+
+AUTHOR_NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(pre_save, sender=Post)
+def post_version_bump(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding:
+        return
+    if update_fields is None or 'version' in update_fields:
+        instance.version += 1
+
+
+@receiver(pre_save, sender=User)
+def author_renaming(sender, instance, update_fields=None, **kwargs):
+    # Имя автора выводится в карточках его постов и в комментариях.
+    instance._renamed_from = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(
+        AUTHOR_NAME_FIELDS
+    ):
+        return
+    loaded = User.objects.filter(pk=instance.pk).values(
+        *AUTHOR_NAME_FIELDS
+    ).first()
+    if loaded and any(
+        loaded[name] != getattr(instance, name) for name in AUTHOR_NAME_FIELDS
+    ):
+        instance._renamed_from = loaded['username']
+
+
+@receiver(post_save, sender=User)
+def author_renamed(sender, instance, **kwargs):
+    username = getattr(instance, '_renamed_from', None)
+    if username is None:
+        return
+    instance._renamed_from = None
+    posts = Post.objects.filter(author=instance)
+    slugs = Group.objects.filter(post__author=instance).values_list(
+        'slug', flat=True
+    ).distinct()
+    commented = Comment.objects.filter(author=instance).values_list(
+        'post_id', flat=True
+    ).distinct()
+    posts.update(version=F('version') + 1)
+    caching.bump(
+        'all', 'comments',
+        caching.author_scope(username),
+        caching.author_scope(instance.username),
+        *[caching.group_scope(slug) for slug in slugs],
+        *[caching.comments_scope(post_id) for post_id in commented],
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(User, instance.author_id, 'posts_count')
+        feed.fan_out(instance)
+        events.publish_posts([instance])
+    caching.bump(*caching.post_scopes(instance))
+    search.index_post(instance)
+    loaded_image = getattr(instance, '_loaded_image', '')
+    if instance.image.name != loaded_image:
+        blobs.replace(loaded_image, instance.image.name or '')
+        thumbnails.queue_thumbnails(instance)
+    instance._loaded_group_id = instance.group_id
+    instance._loaded_image = instance.image.name or ''
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.increment(User, instance.author_id, 'posts_count', -1)
+    cache.delete(caching.post_card_key(instance))
+    caching.bump(
+        *caching.post_scopes(instance), caching.comments_scope(instance.id)
+    )
+    search.remove_post(instance)
+    blobs.release(instance.image.name)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    caching.bump(caching.group_scope(instance.slug))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    # Посты группы останутся без неё (SET_NULL) без сигналов постов:
+    # устаревают общие списки и профили их авторов.
+    author_ids = Post.objects.filter(group=instance).values_list(
+        'author_id', flat=True
+    ).distinct()
+    caching.bump('all', *caching.author_scopes(*author_ids))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(Post, instance.post_id, 'comments_count')
+        trending.comment_added(instance)
+    caching.bump('comments', caching.comments_scope(instance.post_id))
+    search.index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.increment(Post, instance.post_id, 'comments_count', -1)
+    trending.comment_removed(instance)
+    caching.bump('comments', caching.comments_scope(instance.post_id))
+    search.remove_comment(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(User, instance.author_id, 'followers_count')
+        counters.increment(User, instance.user_id, 'following_count')
+        feed.backfill(instance.user_id, instance.author_id)
+        trending.follow_added(instance)
+        caching.bump(
+            *caching.author_scopes(instance.user_id, instance.author_id)
+        )
+        run_in_background(suggestions.refresh_after_follow, instance.user_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.increment(User, instance.author_id, 'followers_count', -1)
+    counters.increment(User, instance.user_id, 'following_count', -1)
+    feed.prune(instance.user_id, instance.author_id)
+    run_in_background(feed.stop_fan_in, instance.author_id)
+    trending.follow_removed(instance)
+    caching.bump(*caching.author_scopes(instance.user_id, instance.author_id))
+    run_in_background(suggestions.refresh_after_follow, instance.user_id)
@@ -0,0 +1,89 @@
+"""Рекомендации подписок по графу подписок («друзья друзей»).
+
+Автор рекомендуется пользователю, если на него подписаны те, на кого
+подписан сам пользователь; вес — число таких подписок. Считать это
+при запросе дорого, поэтому рекомендации хранятся в ``FollowSuggestion``:
+для пачки пользователей веса и ``SUGGESTIONS_TOP_K`` лучших авторов
+считает один запрос ``INSERT ... SELECT`` с оконной функцией.
+
+Команда ``rebuild_suggestions`` пересчитывает всех пользователей.
+Подписка или отписка пересчитывает в фоне самого пользователя и его
+подписчиков, но не больше ``SUGGESTIONS_REFRESH_MAX_FOLLOWERS``:
+остальных обновит следующий полный пересчёт.
+"""
+from django.db import connection, transaction
+from yatube.settings import (SUGGESTIONS_CHUNK_SIZE,
+                             SUGGESTIONS_REFRESH_MAX_FOLLOWERS,
+                             SUGGESTIONS_TOP_K)
+
+from . import caching
+from .models import Follow, FollowSuggestion, User
+
+SUGGEST_SQL = (
+    'INSERT INTO {suggestion} (user_id, author_id, score) '
+    'SELECT user_id, author_id, score FROM ('
+    'SELECT mine.user_id AS user_id, theirs.author_id AS author_id, '
+    'COUNT(*) AS score, ROW_NUMBER() OVER ('
+    'PARTITION BY mine.user_id ORDER BY COUNT(*) DESC, theirs.author_id'
+    ') AS place '
+    'FROM {follow} mine JOIN {follow} theirs '
+    'ON theirs.user_id = mine.author_id '
+    'WHERE mine.user_id IN ({users}) '
+    'AND theirs.author_id != mine.user_id '
+    'AND NOT EXISTS (SELECT 1 FROM {follow} own '
+    'WHERE own.user_id = mine.user_id '
+    'AND own.author_id = theirs.author_id) '
+    'GROUP BY mine.user_id, theirs.author_id'
+    ') WHERE place <= %s'
+)
+
+
+def refresh(user_ids):
+    """Пересчитывает рекомендации пользователей пачками."""
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), SUGGESTIONS_CHUNK_SIZE):
+        chunk = user_ids[start:start + SUGGESTIONS_CHUNK_SIZE]
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(user_id__in=chunk).delete()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    SUGGEST_SQL.format(
+                        suggestion=FollowSuggestion._meta.db_table,
+                        follow=Follow._meta.db_table,
+                        users=', '.join(['%s'] * len(chunk)),
+                    ),
+                    [*chunk, SUGGESTIONS_TOP_K],
+                )
+        # Рекомендации показываются на странице своего профиля.
+        caching.bump(*caching.author_scopes(*chunk))
+
+
+def rebuild():
+    """Пересчитывает рекомендации всех пользователей."""
+    after = 0
+    while True:
+        chunk = list(
+            User.objects.filter(pk__gt=after).order_by('pk')
+            .values_list('pk', flat=True)[:SUGGESTIONS_CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        refresh(chunk)
+        after = chunk[-1]
+
+
+def refresh_after_follow(user_id):
+    """Пересчёт после подписки или отписки пользователя ``user_id``.
+
+    Меняются рекомендации его самого и тех, кто подписан на него.
+    """
+    followers = Follow.objects.filter(author_id=user_id).values_list(
+        'user_id', flat=True
+    )[:SUGGESTIONS_REFRESH_MAX_FOLLOWERS]
+    refresh([user_id, *followers])
+
+
+def for_user(user, limit):
+    return FollowSuggestion.objects.filter(user=user).select_related(
+        'author'
+    )[:limit]
@@ -0,0 +1,11 @@
+from django import template
+
+from ..thumbnails import thumbnail_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(image, geometry_string, **options):
+    """URL миниатюры картинки поста или оригинала, пока её нет."""
+    return thumbnail_url(image, geometry_string, **options)
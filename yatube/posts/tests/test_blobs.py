@@ -0,0 +1,166 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from yatube.settings import IMAGE_BLOB_GRACE_SECONDS
+
+from .. import blobs, thumbnails
+from ..models import ImageBlob, Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_GIF = SMALL_GIF.replace(b'\xFF\xFF\xFF', b'\xFE\xFE\xFE')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageBlobTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        # Удаление файлов выполняется сразу, а не после коммита в фоне,
+        # и только что загруженные файлы удаляются без задержки.
+        for patcher in (
+            mock.patch.object(
+                blobs, 'run_in_background',
+                side_effect=lambda func, *args: func(*args),
+            ),
+            mock.patch.object(blobs, 'IMAGE_BLOB_GRACE_SECONDS', 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def create_post(self, content=SMALL_GIF, name='small.gif'):
+        return Post.objects.create(
+            text='Пост с картинкой',
+            author=ImageBlobTests.user,
+            image=SimpleUploadedFile(
+                name=name, content=content, content_type='image/gif'
+            ),
+        )
+
+    def age(self, path):
+        """Делает файл старше льготного срока."""
+        moment = time.time() - IMAGE_BLOB_GRACE_SECONDS - 1
+        os.utime(path, (moment, moment))
+
+    def refs(self, name):
+        blob = ImageBlob.objects.filter(name=name).first()
+        return blob.refs if blob else 0
+
+    def test_duplicates_share_one_file(self):
+        first = self.create_post()
+        second = self.create_post(name='copy.GIF')
+        expected = 'posts/' + hashlib.sha256(SMALL_GIF).hexdigest() + '.gif'
+        self.assertEqual(first.image.name, expected)
+        self.assertEqual(second.image.name, expected)
+        self.assertEqual(self.refs(expected), 2)
+        self.assertTrue(os.path.exists(first.image.path))
+        directory = os.path.join(TEMP_MEDIA_ROOT, 'posts')
+        self.assertFalse(any(
+            name.startswith('.upload-') for name in os.listdir(directory)
+        ))
+
+    def test_file_removed_with_last_reference(self):
+        first = self.create_post()
+        second = self.create_post()
+        thumbnails.generate_thumbnails(first.id)
+        thumbnail = thumbnails.lookup_backend.get_existing_thumbnail(
+            second.image, *thumbnails.POST_IMAGE_THUMBNAILS[0][:1],
+            **thumbnails.POST_IMAGE_THUMBNAILS[0][1]
+        )
+        self.assertIsNotNone(thumbnail, 'Миниатюра общая для дубликатов')
+        path = first.image.path
+
+        first.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(thumbnail.exists())
+
+        second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(thumbnail.exists())
+        self.assertEqual(self.refs(first.image.name), 0)
+
+    def test_replacing_image_moves_reference(self):
+        post = self.create_post()
+        old_name = post.image.name
+        post.image = SimpleUploadedFile(
+            name='other.gif', content=OTHER_GIF, content_type='image/gif'
+        )
+        post.save()
+        self.assertEqual(self.refs(old_name), 0)
+        self.assertEqual(self.refs(post.image.name), 1)
+        self.assertFalse(os.path.exists(os.path.join(
+            TEMP_MEDIA_ROOT, old_name
+        )))
+
+    def test_reupload_before_cleanup_keeps_file(self):
+        """Файл, снова загруженный до фоновой очистки, не удаляется."""
+        post = self.create_post()
+        path = post.image.path
+        self.age(path)
+        queued = []
+        defer = mock.patch.object(
+            blobs, 'run_in_background',
+            side_effect=lambda func, *args: queued.append((func, args)),
+        )
+        grace = mock.patch.object(
+            blobs, 'IMAGE_BLOB_GRACE_SECONDS', IMAGE_BLOB_GRACE_SECONDS
+        )
+        with defer, grace:
+            post.delete()
+            # Те же байты уже записаны, а пост с ними ещё не сохранён.
+            post.image.storage.save('posts/again.gif', ContentFile(SMALL_GIF))
+            self.assertEqual(queued, [(blobs.remove_file, (post.image.name,))])
+            for func, args in queued:
+                func(*args)
+        self.assertTrue(os.path.exists(path))
+
+    def test_young_file_removed_by_sweep(self):
+        """Файл, удалённый сразу после загрузки, удаляет sweep_images."""
+        grace = mock.patch.object(
+            blobs, 'IMAGE_BLOB_GRACE_SECONDS', IMAGE_BLOB_GRACE_SECONDS
+        )
+        with grace:
+            post = self.create_post()
+            path = post.image.path
+            post.delete()
+            self.assertTrue(os.path.exists(path))
+            self.assertTrue(
+                ImageBlob.objects.filter(name=post.image.name).exists()
+            )
+            call_command('sweep_images', stdout=StringIO())
+            self.assertTrue(os.path.exists(path))
+
+            self.age(path)
+            call_command('sweep_images', stdout=StringIO())
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(
+            ImageBlob.objects.filter(name=post.image.name).exists()
+        )
@@ -0,0 +1,264 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import caching
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            text='Исходный текст',
+            author=cls.user,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(PostCardCacheTests.user)
+
+    def test_card_served_from_cache_until_version_changes(self):
+        """Карточка берётся из кэша, пока не изменится версия поста."""
+        post = Post.objects.get(pk=PostCardCacheTests.post.pk)
+        url = reverse('posts:index')
+        self.assertContains(self.authorized_client.get(url), 'Исходный текст')
+
+        Post.objects.filter(pk=post.pk).update(text='Тихая правка')
+        self.assertContains(self.authorized_client.get(url), 'Исходный текст')
+
+        post.text = 'Новый текст'
+        post.save()
+        response = self.authorized_client.get(url)
+        self.assertContains(response, 'Новый текст')
+        self.assertNotContains(response, 'Исходный текст')
+
+    def test_post_edit_bumps_version(self):
+        """Редактирование поста меняет его версию."""
+        post = Post.objects.get(pk=PostCardCacheTests.post.pk)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            data={'text': 'Отредактировано'},
+        )
+        self.assertEqual(
+            Post.objects.get(pk=post.pk).version, post.version + 1
+        )
+
+    def test_author_rename_refreshes_cards(self):
+        """Смена имени автора обновляет карточки его постов."""
+        url = reverse('posts:index')
+        reader = Client()
+        reader.force_login(User.objects.create_user(username='reader'))
+        self.assertNotContains(reader.get(url), 'Лев Толстой')
+        self.assertNotContains(Client().get(url), 'Лев Толстой')
+
+        user = User.objects.get(pk=PostCardCacheTests.user.pk)
+        user.first_name, user.last_name = 'Лев', 'Толстой'
+        user.save()
+        self.assertContains(reader.get(url), 'Лев Толстой')
+        self.assertContains(Client().get(url), 'Лев Толстой')
+
+    def test_last_login_keeps_version(self):
+        """Вход пользователя не меняет версии его постов."""
+        post = Post.objects.get(pk=PostCardCacheTests.post.pk)
+        Client().force_login(PostCardCacheTests.user)
+        self.assertEqual(Post.objects.get(pk=post.pk).version, post.version)
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other',
+            description='Тестовое описание',
+        )
+        Post.objects.create(text='Первый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.group_url = reverse(
+            'posts:group_number',
+            kwargs={'slug': AnonymousPageCacheTests.group.slug}
+        )
+
+    def test_anonymous_pages_served_from_cache(self):
+        """Повторный запрос анонимной страницы не обращается к БД."""
+        for url in (reverse('posts:index'), self.group_url):
+            with self.subTest(url=url):
+                self.client.get(url)
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_new_post_invalidates_pages(self):
+        """Новый пост сразу виден на главной и на странице группы."""
+        index_url = reverse('posts:index')
+        self.client.get(index_url)
+        self.client.get(self.group_url)
+        Post.objects.create(
+            text='Свежий пост',
+            author=AnonymousPageCacheTests.user,
+            group=AnonymousPageCacheTests.group,
+        )
+        self.assertContains(self.client.get(index_url), 'Свежий пост')
+        self.assertContains(self.client.get(self.group_url), 'Свежий пост')
+
+    def test_new_post_invalidates_pages_of_every_process(self):
+        """Пост, записанный одним процессом, виден и в кэше другого."""
+        index_url = reverse('posts:index')
+        workers = [LocMemCache('worker-a', {}), LocMemCache('worker-b', {})]
+        for worker in workers:
+            with mock.patch.object(caching, 'cache', worker):
+                self.client.get(index_url)
+        with mock.patch.object(caching, 'cache', workers[0]):
+            Post.objects.create(
+                text='Свежий пост',
+                author=AnonymousPageCacheTests.user,
+            )
+        with mock.patch.object(caching, 'cache', workers[1]):
+            self.assertContains(self.client.get(index_url), 'Свежий пост')
+
+    def test_post_moved_between_groups_invalidates_both(self):
+        """Перенос поста в другую группу сбрасывает кэш обеих групп."""
+        post = Post.objects.create(
+            text='Переносимый пост',
+            author=AnonymousPageCacheTests.user,
+            group=AnonymousPageCacheTests.group,
+        )
+        self.assertContains(self.client.get(self.group_url), post.text)
+        post = Post.objects.get(pk=post.pk)
+        post.group = AnonymousPageCacheTests.other_group
+        post.save()
+        self.assertNotContains(self.client.get(self.group_url), post.text)
+
+    def test_other_group_page_stays_cached(self):
+        """Пост в одной группе не сбрасывает кэш другой."""
+        other_url = reverse(
+            'posts:group_number',
+            kwargs={'slug': AnonymousPageCacheTests.other_group.slug}
+        )
+        self.client.get(other_url)
+        Post.objects.create(
+            text='Пост в группе',
+            author=AnonymousPageCacheTests.user,
+            group=AnonymousPageCacheTests.group,
+        )
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        Post.objects.create(
+            text='Первый пост', author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ConditionalGetTests.reader)
+        self.urls = (
+            reverse('posts:index'),
+            reverse(
+                'posts:group_number',
+                kwargs={'slug': ConditionalGetTests.group.slug}
+            ),
+            reverse(
+                'posts:profile',
+                kwargs={'username': ConditionalGetTests.user.username}
+            ),
+        )
+
+    def revalidate(self, url, client=None):
+        client = client or self.authorized_client
+        etag = client.get(url)['ETag']
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_answer_not_modified(self):
+        """Неизменившаяся страница отвечает 304 без запросов к БД."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_new_post_changes_etag(self):
+        """Новый пост меняет ETag главной, группы и профиля автора."""
+        etags = [self.authorized_client.get(url)['ETag'] for url in self.urls]
+        Post.objects.create(
+            text='Свежий пост',
+            author=ConditionalGetTests.user,
+            group=ConditionalGetTests.group,
+        )
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertContains(response, 'Свежий пост')
+
+    def test_follow_changes_profile_etag(self):
+        """Подписка меняет ETag профиля: кнопка и число подписчиков."""
+        url = self.urls[2]
+        etag = self.authorized_client.get(url)['ETag']
+        Follow.objects.create(
+            user=ConditionalGetTests.reader, author=ConditionalGetTests.user
+        )
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user_and_query(self):
+        """ETag разный для разных пользователей и параметров запроса."""
+        url = reverse('posts:index')
+        etag = self.authorized_client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+        self.assertNotEqual(
+            self.authorized_client.get(url, {'page': 2})['ETag'], etag
+        )
+
+    def test_comment_does_not_change_list_etag(self):
+        """Комментарий не сбрасывает валидатор главной страницы."""
+        url = reverse('posts:index')
+        etag = self.authorized_client.get(url)['ETag']
+        Comment.objects.create(
+            post=Post.objects.first(),
+            author=ConditionalGetTests.reader,
+            text='Комментарий',
+        )
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_page_has_no_etag(self):
+        """Ответ 404 не получает ETag."""
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'nobody'})
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+@mock.patch('posts.views.COMMENTS_ON_PAGE', 3)
+@mock.patch('api.pagination.KeysetPagination.page_size', 3)
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Комментарий {i}'
+            )
+            for i in range(7)
+        ]
+        # Новые сверху, при равном времени — по убыванию id.
+        cls.newest_first = sorted(
+            cls.comments, key=lambda c: (c.pub_date, c.id), reverse=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_detail_shows_newest_comments(self):
+        response = self.client.get(
+            reverse('posts:post_detail', args=[CommentPaginationTests.post.id])
+        )
+        comments = response.context['comments']
+        self.assertEqual(
+            list(comments), CommentPaginationTests.newest_first[:3]
+        )
+        self.assertTrue(comments.has_next())
+        self.assertContains(response, 'js-more-comments')
+
+    def test_fragment_loads_older_comments(self):
+        """Порции по курсору проходят все комментарии без повторов."""
+        url = reverse(
+            'posts:post_comments', args=[CommentPaginationTests.post.id]
+        )
+        loaded = []
+        cursor = ''
+        while cursor is not None:
+            response = self.client.get(url, {'after': cursor})
+            self.assertTemplateNotUsed(response, 'base.html')
+            page = response.context['comments']
+            loaded.extend(page)
+            cursor = page.next_cursor
+        self.assertEqual(loaded, CommentPaginationTests.newest_first)
+
+    def test_fragment_missing_post(self):
+        response = self.client.get(reverse('posts:post_comments', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_api_cursor_pagination(self):
+        client = APIClient()
+        url = f'/api/v1/posts/{CommentPaginationTests.post.id}/comments/'
+        loaded = []
+        while url:
+            data = client.get(url).json()
+            self.assertLessEqual(len(data['results']), 3)
+            loaded.extend(comment['id'] for comment in data['results'])
+            url = data['next']
+        self.assertEqual(
+            loaded,
+            [comment.id for comment in CommentPaginationTests.newest_first],
+        )
@@ -0,0 +1,75 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+
+    def test_counters_follow_create_and_delete(self):
+        """Счётчики меняются при создании и удалении объектов."""
+        user = CountersTests.user
+        author = CountersTests.author
+        post = Post.objects.create(text='Тестовый пост', author=author)
+        comment = Comment.objects.create(post=post, author=user, text='Да')
+        follow = Follow.objects.create(user=user, author=author)
+        author.refresh_from_db()
+        user.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual(author.posts_count, 1)
+        self.assertEqual(author.followers_count, 1)
+        self.assertEqual(user.following_count, 1)
+        self.assertEqual(post.comments_count, 1)
+
+        comment.delete()
+        follow.delete()
+        post.refresh_from_db()
+        post.delete()
+        author.refresh_from_db()
+        user.refresh_from_db()
+        self.assertEqual(author.posts_count, 0)
+        self.assertEqual(author.followers_count, 0)
+        self.assertEqual(user.following_count, 0)
+
+    def test_api_create_updates_counters(self):
+        """Посты и комментарии из API учитываются в счётчиках."""
+        client = APIClient()
+        client.force_authenticate(CountersTests.author)
+        author_id = CountersTests.author.id
+        response = client.post(
+            '/api/v1/posts/', {'text': 'Из API', 'author': author_id}
+        )
+        post_id = response.data['id']
+        client.post(
+            f'/api/v1/posts/{post_id}/comments/',
+            {'text': 'Комментарий', 'post': post_id, 'author': author_id},
+        )
+        CountersTests.author.refresh_from_db()
+        self.assertEqual(CountersTests.author.posts_count, 1)
+        self.assertEqual(Post.objects.get(pk=post_id).comments_count, 1)
+
+    def test_recount_command_fixes_drift(self):
+        """Команда recount_counters находит и исправляет расхождения."""
+        Post.objects.create(text='Тестовый пост', author=CountersTests.author)
+        User.objects.filter(pk=CountersTests.author.pk).update(posts_count=7)
+
+        out = StringIO()
+        call_command('recount_counters', '--dry-run', stdout=out)
+        self.assertIn('User.posts_count: расхождений 1', out.getvalue())
+        CountersTests.author.refresh_from_db()
+        self.assertEqual(CountersTests.author.posts_count, 7)
+
+        call_command('recount_counters', stdout=StringIO())
+        CountersTests.author.refresh_from_db()
+        self.assertEqual(CountersTests.author.posts_count, 1)
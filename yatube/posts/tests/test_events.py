@@ -0,0 +1,146 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import events, views
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+def post_events(response):
+    """id и данные событий ``post`` из потока SSE."""
+    body = b''.join(response.streaming_content).decode()
+    result = []
+    for block in body.split('\n\n'):
+        fields = dict(
+            line.split(': ', 1) for line in block.splitlines()
+            if not line.startswith(':')
+        )
+        if fields.get('event') == 'post':
+            result.append((int(fields['id']), json.loads(fields['data'])))
+    return result
+
+
+class PostEventsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.first = Post.objects.create(text='Старый пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        # Поток закрывается сразу после отправки накопленных постов.
+        for patcher in (
+            mock.patch.object(events, 'EVENTS_MAX_SECONDS', 0),
+            mock.patch.object(views, 'EVENTS_LIVE', True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = Client()
+        self.client.force_login(PostEventsTests.reader)
+
+    def test_group_stream_resumes_from_last_event_id(self):
+        """Поток группы отдаёт посты группы после Last-Event-ID."""
+        in_group = Post.objects.create(
+            text='В группе',
+            author=PostEventsTests.other,
+            group=PostEventsTests.group,
+        )
+        Post.objects.create(text='Без группы', author=PostEventsTests.other)
+        response = self.client.get(
+            reverse('posts:group_stream', args=['group']),
+            HTTP_LAST_EVENT_ID=str(PostEventsTests.first.id),
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        received = post_events(response)
+        self.assertEqual([pk for pk, _ in received], [in_group.id])
+        self.assertIn('В группе', received[0][1]['html'])
+
+    def test_stream_starts_after_latest_post(self):
+        """Без Last-Event-ID старые посты не отправляются."""
+        response = self.client.get(reverse('posts:follow_stream'))
+        self.assertEqual(post_events(response), [])
+
+    def test_follow_stream_only_followed_authors(self):
+        followed = Post.objects.create(
+            text='Подписка', author=PostEventsTests.author
+        )
+        Post.objects.create(text='Чужой', author=PostEventsTests.other)
+        response = self.client.get(
+            reverse('posts:follow_stream'),
+            {'last_id': PostEventsTests.first.id},
+        )
+        self.assertEqual(
+            [pk for pk, _ in post_events(response)], [followed.id]
+        )
+
+    def test_streams_require_login(self):
+        for url in (
+            reverse('posts:follow_stream'),
+            reverse('posts:group_stream', args=['group']),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(Client().get(url).status_code, 302)
+
+    def test_only_logged_in_pages_subscribe(self):
+        """Кэшируемая страница группы для анонима не открывает поток."""
+        url = reverse('posts:group_number', args=['group'])
+        self.assertContains(self.client.get(url), 'EventSource')
+        self.assertNotContains(Client().get(url), 'EventSource')
+
+    def test_disabled_by_default(self):
+        """Без EVENTS_LIVE страницы не подписываются, потоков нет."""
+        with mock.patch.object(views, 'EVENTS_LIVE', False):
+            page = self.client.get(reverse('posts:follow_index'))
+            stream = self.client.get(reverse('posts:follow_stream'))
+        self.assertNotContains(page, 'EventSource')
+        self.assertEqual(stream.status_code, 404)
+
+    @mock.patch.object(events, 'EVENTS_MAX_SECONDS', 0.2)
+    @mock.patch.object(events, 'EVENTS_HEARTBEAT_SECONDS', 0.05)
+    def test_heartbeat(self):
+        """Пока постов нет, поток шлёт комментарии-пинги."""
+        response = self.client.get(reverse('posts:follow_stream'))
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('retry: '))
+        self.assertIn(': ping\n\n', body)
+
+
+class BrokerTests(TestCase):
+    def test_publish_wakes_only_subscribed_channels(self):
+        broker = events.Broker()
+        group = broker.subscribe([events.group_channel(1)])
+        author = broker.subscribe([events.author_channel(1)])
+        broker.publish(events.group_channel(1), events.author_channel(2))
+        self.assertTrue(group.wait(0))
+        self.assertFalse(author.wait(0))
+        broker.unsubscribe(group)
+        broker.unsubscribe(author)
+        self.assertEqual(broker._channels, {})
+
+    def test_new_post_published_on_commit(self):
+        user = User.objects.create_user(username='author')
+        subscription = events.broker.subscribe(
+            [events.author_channel(user.id)]
+        )
+        self.addCleanup(events.broker.unsubscribe, subscription)
+        with mock.patch.object(
+            events.transaction, 'on_commit', side_effect=lambda func: func()
+        ) as on_commit:
+            Post.objects.create(text='Новый пост', author=user)
+        on_commit.assert_called()
+        self.assertTrue(subscription.wait(0))
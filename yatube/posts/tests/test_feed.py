@@ -0,0 +1,160 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from yatube.settings import PAGINATOR_OBJECTS_ON_PAGE
+
+from .. import feed
+from ..models import FeedEntry, Follow, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.old_post = Post.objects.create(
+            text='Пост до подписки',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FeedTests.user)
+
+    def follow_page_posts(self):
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return [post.id for post in response.context['page_obj']]
+
+    def test_follow_backfills_feed(self):
+        """Подписка добавляет в ленту уже опубликованные посты автора."""
+        self.authorized_client.get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': FeedTests.author.username})
+        )
+        self.assertEqual(self.follow_page_posts(), [FeedTests.old_post.id])
+
+    def test_new_post_fanned_out(self):
+        """Новый пост попадает в ленты подписчиков."""
+        Follow.objects.create(user=FeedTests.user, author=FeedTests.author)
+        post = Post.objects.create(text='Новый пост', author=FeedTests.author)
+        self.assertTrue(
+            FeedEntry.objects.filter(user=FeedTests.user, post=post).exists()
+        )
+        self.assertEqual(
+            self.follow_page_posts(), [post.id, FeedTests.old_post.id]
+        )
+
+    def test_unfollow_and_delete_prune_feed(self):
+        """Отписка и удаление поста убирают записи из ленты."""
+        Follow.objects.create(user=FeedTests.user, author=FeedTests.author)
+        post = Post.objects.create(text='Новый пост', author=FeedTests.author)
+        post.delete()
+        self.assertEqual(self.follow_page_posts(), [FeedTests.old_post.id])
+
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': FeedTests.author.username})
+        )
+        self.assertFalse(
+            FeedEntry.objects.filter(user=FeedTests.user).exists()
+        )
+        self.assertEqual(self.follow_page_posts(), [])
+
+    def test_heavy_author_read_on_fan_in(self):
+        """Посты авторов без рассылки подмешиваются при чтении."""
+        Follow.objects.create(user=FeedTests.user, author=FeedTests.author)
+        with mock.patch.object(feed, 'FEED_FANOUT_MAX_FOLLOWERS', 0):
+            post = Post.objects.create(
+                text='Пост без рассылки',
+                author=FeedTests.author,
+            )
+        self.assertFalse(FeedEntry.objects.filter(post=post).exists())
+        self.assertEqual(
+            self.follow_page_posts(), [post.id, FeedTests.old_post.id]
+        )
+
+    def test_author_back_to_fan_out_keeps_posts(self):
+        """Посты, опубликованные без рассылки, не пропадают из ленты."""
+        Follow.objects.create(user=FeedTests.user, author=FeedTests.author)
+        with mock.patch.object(feed, 'FEED_FANOUT_MAX_FOLLOWERS', 0):
+            post = Post.objects.create(
+                text='Пост без рассылки',
+                author=FeedTests.author,
+            )
+            feed.stop_fan_in(FeedTests.author.id)
+        self.assertEqual(
+            self.follow_page_posts(), [post.id, FeedTests.old_post.id]
+        )
+
+        feed.stop_fan_in(FeedTests.author.id)
+        self.assertFalse(
+            User.objects.get(pk=FeedTests.author.pk).feed_fan_in
+        )
+        self.assertTrue(FeedEntry.objects.filter(post=post).exists())
+        self.assertEqual(
+            self.follow_page_posts(), [post.id, FeedTests.old_post.id]
+        )
+
+    @mock.patch.object(feed, 'FEED_BACKFILL_LIMIT', 2)
+    def test_rebuild_limits_posts_per_author(self):
+        Follow.objects.create(user=FeedTests.user, author=FeedTests.author)
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=FeedTests.author)
+            for i in range(3)
+        ]
+        feed.rebuild()
+        self.assertEqual(
+            self.follow_page_posts(), [posts[2].id, posts[1].id]
+        )
+
+    def test_feed_cursor_pages(self):
+        """Лента подписок листается курсорами."""
+        Follow.objects.create(user=FeedTests.user, author=FeedTests.author)
+        for i in range(PAGINATOR_OBJECTS_ON_PAGE):
+            Post.objects.create(text=f'Пост {i}', author=FeedTests.author)
+        url = reverse('posts:follow_index')
+
+        first_page = self.authorized_client.get(url).context['page_obj']
+        second_page = self.authorized_client.get(
+            url, {'after': first_page.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(
+            [post.id for post in second_page], [FeedTests.old_post.id]
+        )
+
+    def test_fan_in_feed_pages_merge_slices(self):
+        """Лента с автором без рассылки листается без повторов."""
+        light = User.objects.create_user(username='light')
+        Follow.objects.create(user=FeedTests.user, author=light)
+        Follow.objects.create(user=FeedTests.user, author=FeedTests.author)
+        posts = [FeedTests.old_post]
+        with mock.patch.object(feed, 'FEED_FANOUT_MAX_FOLLOWERS', 0):
+            for i in range(PAGINATOR_OBJECTS_ON_PAGE + 2):
+                posts.append(Post.objects.create(
+                    text=f'Пост {i}',
+                    author=light if i % 2 else FeedTests.author,
+                ))
+        expected = [post.id for post in reversed(posts)]
+        url = reverse('posts:follow_index')
+
+        first = self.authorized_client.get(url).context['page_obj']
+        second = self.authorized_client.get(
+            url, {'after': first.next_cursor}
+        ).context['page_obj']
+        back = self.authorized_client.get(
+            url, {'before': second.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(
+            [post.id for post in first] + [post.id for post in second],
+            expected,
+        )
+        self.assertEqual(
+            [post.id for post in back], [post.id for post in first]
+        )
@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 
@@ -69,6 +70,10 @@ class PostsFormTests(TestCase):
         )
         self.gif_name = 'small.gif'
         self.new_gif_name = 'new.gif'
+        # Картинки хранятся под хэшем содержимого.
+        self.image_name = (
+            'posts/' + hashlib.sha256(self.small_gif).hexdigest() + '.gif'
+        )
         self.uploaded = SimpleUploadedFile(
             name=self.gif_name,
             content=self.small_gif,
@@ -103,7 +108,7 @@ class PostsFormTests(TestCase):
         post = Post.objects.order_by('-id')[:1][0]
         self.assertEqual(post.text, self.post_text_create)
         self.assertEqual(post.group.id, group.id)
-        self.assertEqual(post.image.name, f'posts/{self.gif_name}')
+        self.assertEqual(post.image.name, self.image_name)
         self.assertEqual(Post.objects.count(), posts_count + 1)
 
     def test_create_comment(self):
@@ -151,5 +156,5 @@ class PostsFormTests(TestCase):
         post = Post.objects.get(id=post.id)
         self.assertEqual(post.text, self.post_text_edit)
         self.assertEqual(post.group.id, group.id)
-        self.assertEqual(post.image.name, f'posts/{self.new_gif_name}')
+        self.assertEqual(post.image.name, self.image_name)
         self.assertEqual(Post.objects.count(), posts_count)
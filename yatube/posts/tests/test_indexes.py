@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class QueryPlanTests(TestCase):
+    """Запросы страниц и API идут по индексам.
+
+    Падает, если запрос с условием ``WHERE`` читает таблицу сканированием,
+    а не поиском по индексу (``SEARCH``) или покрывающим индексом,
+    или если план сортирует строки во временном B-дереве. Без условия
+    допустим обход индекса в порядке сортировки или чтение с ``LIMIT``.
+    Полнотекстовый поиск упорядочен по релевантности и не проверяется.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        # Автор без рассылки: его посты лента подписок читает при чтении.
+        cls.heavy = User.objects.create_user(
+            username='heavy', feed_fan_in=True
+        )
+        Follow.objects.create(user=cls.user, author=cls.heavy)
+        Post.objects.create(text='Пост без рассылки', author=cls.heavy)
+        for i in range(15):
+            post = Post.objects.create(
+                text=f'Пост {i}', author=cls.author, group=cls.group
+            )
+            Comment.objects.create(
+                post=post, author=cls.user, text=f'Комментарий {i}'
+            )
+        cls.post = post
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(QueryPlanTests.user)
+        post_id = QueryPlanTests.post.id
+        self.urls = [
+            reverse('posts:index'),
+            reverse('posts:groups'),
+            reverse(
+                'posts:group_number',
+                kwargs={'slug': QueryPlanTests.group.slug}
+            ),
+            reverse(
+                'posts:profile',
+                kwargs={'username': QueryPlanTests.author.username}
+            ),
+            reverse('posts:post_detail', kwargs={'post_id': post_id}),
+            reverse('posts:post_comments', kwargs={'post_id': post_id}),
+            reverse('posts:follow_index'),
+            reverse('posts:popular'),
+            '/api/v1/posts/',
+            '/api/v1/posts/popular/',
+            '/api/v1/posts/?ids=1,2,3',
+            f'/api/v1/posts/{post_id}/',
+            f'/api/v1/posts/{post_id}/comments/',
+        ]
+
+    def query_plans(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                details = [row[3] for row in cursor.fetchall()]
+            yield sql, details
+
+    def test_views_use_indexes(self):
+        for url in self.urls:
+            for sql, details in self.query_plans(url):
+                if any('VIRTUAL TABLE' in detail for detail in details):
+                    continue
+                filtered = ' WHERE ' in sql
+                for detail in details:
+                    with self.subTest(url=url, sql=sql, plan=detail):
+                        self.assertNotIn('TEMP B-TREE', detail)
+                        if not detail.startswith('SCAN '):
+                            continue
+                        if filtered:
+                            self.assertIn('USING COVERING INDEX', detail)
+                        else:
+                            self.assertTrue(
+                                ' USING ' in detail or ' LIMIT ' in sql
+                            )
+
+
+class FollowUniqueTests(TestCase):
+    def test_duplicate_follow_rejected(self):
+        """Повторная подписка на того же автора не сохраняется."""
+        user = User.objects.create_user(username='reader')
+        author = User.objects.create_user(username='author')
+        Follow.objects.create(user=user, author=author)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=user, author=author)
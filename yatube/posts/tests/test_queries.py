@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Допустимое число запросов к БД на страницу, включая сессию и пользователя.
+QUERY_BUDGETS = {
+    'posts:index': 3,
+    'posts:group_number': 4,
+    'posts:profile': 6,
+    'posts:post_detail': 4,
+    'posts:follow_index': 5,
+    'posts:groups': 4,
+}
+
+
+class PostsQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.author,
+            group=cls.group,
+        )
+
+    @classmethod
+    def create_posts(cls, count):
+        """Добавляет посты автора и комментарии разных пользователей."""
+        for i in range(count):
+            post = Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=cls.author,
+                group=cls.group,
+            )
+            Comment.objects.create(
+                post=cls.post,
+                author=User.objects.create_user(
+                    username=f'commentator_{post.id}'
+                ),
+                text=f'Комментарий {i}',
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(PostsQueryBudgetTests.user)
+        self.urls = {
+            'posts:index': reverse('posts:index'),
+            'posts:group_number': reverse(
+                'posts:group_number',
+                kwargs={'slug': PostsQueryBudgetTests.group.slug}
+            ),
+            'posts:profile': reverse(
+                'posts:profile',
+                kwargs={'username': PostsQueryBudgetTests.author.username}
+            ),
+            'posts:post_detail': reverse(
+                'posts:post_detail',
+                kwargs={'post_id': PostsQueryBudgetTests.post.id}
+            ),
+            'posts:follow_index': reverse('posts:follow_index'),
+            'posts:groups': reverse('posts:groups'),
+        }
+
+    def count_queries(self):
+        counts = {}
+        for name, url in self.urls.items():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.authorized_client.get(url)
+            counts[name] = len(queries)
+        return counts
+
+    def test_views_fit_query_budget(self):
+        """Страницы укладываются в бюджет запросов к БД."""
+        PostsQueryBudgetTests.create_posts(5)
+        for name, count in self.count_queries().items():
+            with self.subTest(view=name):
+                self.assertLessEqual(count, QUERY_BUDGETS[name])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        """Число запросов не зависит от числа постов и комментариев."""
+        PostsQueryBudgetTests.create_posts(2)
+        before = self.count_queries()
+        PostsQueryBudgetTests.create_posts(8)
+        self.assertEqual(self.count_queries(), before)
@@ -0,0 +1,134 @@
+from io import StringIO
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from yatube.settings import PAGINATOR_OBJECTS_ON_PAGE
+
+from .. import search
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            text='Вечером собрались в редакции поговорить о театре',
+            author=cls.user,
+        )
+        cls.other_post = Post.objects.create(
+            text='Проект Шехтеля всем нравится',
+            author=cls.user,
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.other_post,
+            author=cls.user,
+            text='Театр будет народным',
+        )
+
+    def found_posts(self, query):
+        response = self.client.get(reverse('posts:search'), {'q': query})
+        return [post.id for post in response.context['posts']]
+
+    def test_search_finds_posts_and_comments(self):
+        """Поиск находит посты по тексту и по комментариям."""
+        self.assertCountEqual(
+            self.found_posts('театре'), [SearchTests.post.id]
+        )
+        self.assertCountEqual(
+            self.found_posts('театр'), [SearchTests.other_post.id]
+        )
+        self.assertCountEqual(
+            self.found_posts('Шехтеля'), [SearchTests.other_post.id]
+        )
+
+    def test_index_follows_edits_and_deletes(self):
+        """Индекс обновляется при изменении и удалении."""
+        post = Post.objects.get(pk=SearchTests.post.pk)
+        post.text = 'Совсем другой текст'
+        post.save()
+        self.assertEqual(self.found_posts('театре'), [])
+        self.assertEqual(self.found_posts('другой'), [post.id])
+
+        Comment.objects.get(pk=SearchTests.comment.pk).delete()
+        self.assertEqual(self.found_posts('театр'), [])
+
+    def test_query_syntax_is_escaped(self):
+        """Спецсимволы FTS5 в запросе не ломают поиск."""
+        for query in ('"', 'театре*', 'NOT театре', 'a:b', '(('):
+            with self.subTest(query=query):
+                response = self.client.get(
+                    reverse('posts:search'), {'q': query}
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_api_search_pages_with_cursor(self):
+        """API отдаёт результаты страницами по курсору без повторов."""
+        for i in range(PAGINATOR_OBJECTS_ON_PAGE + 2):
+            Post.objects.create(
+                text=f'Пост про поиск номер {i}', author=SearchTests.user
+            )
+        response = self.client.get('/api/v1/search/', {'q': 'поиск'})
+        first_page = response.json()
+        self.assertEqual(
+            len(first_page['results']), PAGINATOR_OBJECTS_ON_PAGE
+        )
+        second_page = self.client.get(first_page['next']).json()
+        self.assertIsNone(second_page['next'])
+        ids = [hit['id'] for hit in first_page['results']]
+        ids += [hit['id'] for hit in second_page['results']]
+        self.assertEqual(len(set(ids)), PAGINATOR_OBJECTS_ON_PAGE + 2)
+
+    def test_html_search_pages_list_each_post_once(self):
+        """Пост, найденный и по тексту, и по комментариям, — один раз."""
+        posts = [
+            Post.objects.create(
+                text=f'Опера номер {i}', author=SearchTests.user
+            )
+            for i in range(PAGINATOR_OBJECTS_ON_PAGE)
+        ]
+        for _ in range(2):
+            Comment.objects.create(
+                post=posts[-1], author=SearchTests.user, text='Опера'
+            )
+        url = reverse('posts:search')
+        response = self.client.get(url, {'q': 'опера'})
+        found = [post.id for post in response.context['posts']]
+        while response.context['next_cursor']:
+            response = self.client.get(
+                url, {'q': 'опера', 'after': response.context['next_cursor']}
+            )
+            found += [post.id for post in response.context['posts']]
+        self.assertCountEqual(found, [post.id for post in posts])
+
+    def test_admin_search_by_kind(self):
+        """Поиск в админке находит только объекты своей модели."""
+        results, _ = admin.site._registry[Post].get_search_results(
+            None, Post.objects.all(), 'театр'
+        )
+        self.assertEqual(list(results), [])
+        results, _ = admin.site._registry[Comment].get_search_results(
+            None, Comment.objects.all(), 'театр'
+        )
+        self.assertEqual(list(results), [SearchTests.comment])
+        results, _ = admin.site._registry[Post].get_search_results(
+            None, Post.objects.all(), 'Шехтеля'
+        )
+        self.assertEqual(list(results), [SearchTests.other_post])
+
+    def test_rebuild_command_restores_index(self):
+        """Команда rebuild_search_index заполняет индекс заново."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.TABLE}')
+        self.assertEqual(self.found_posts('Шехтеля'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(
+            self.found_posts('Шехтеля'), [SearchTests.other_post.id]
+        )
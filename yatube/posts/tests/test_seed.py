@@ -0,0 +1,36 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Max
+from django.test import TestCase
+
+from .. import counters
+from ..models import Comment, FeedEntry, Follow, Post, User
+
+
+class SeedDataTests(TestCase):
+    def test_seed_data(self):
+        """Команда создаёт данные с согласованными счётчиками и лентой."""
+        call_command(
+            'seed_data', '--users', '30', '--groups', '3', '--posts', '200',
+            '--comments', '300', '--follows', '3', '--popular', '2',
+            stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertFalse(any(counters.recount(fix=False).values()))
+        top = User.objects.aggregate(top=Max('followers_count'))['top']
+        self.assertGreaterEqual(top, 10)
+        follow = Follow.objects.first()
+        self.assertEqual(
+            FeedEntry.objects.filter(
+                user_id=follow.user_id, author_id=follow.author_id
+            ).count(),
+            Post.objects.filter(author_id=follow.author_id).count(),
+        )
+        span = (
+            Post.objects.latest('pub_date').pub_date
+            - Post.objects.earliest('pub_date').pub_date
+        )
+        self.assertGreater(span.days, 1)
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .. import suggestions
+from ..models import Follow, FollowSuggestion
+
+User = get_user_model()
+
+
+class FollowSuggestionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = {
+            name: User.objects.create_user(username=name)
+            for name in ('reader', 'left', 'right', 'common', 'rare')
+        }
+        with mock.patch('posts.signals.run_in_background'):
+            for user, author in (
+                ('reader', 'left'), ('reader', 'right'),
+                ('left', 'common'), ('left', 'rare'),
+                ('right', 'common'), ('right', 'reader'),
+            ):
+                Follow.objects.create(
+                    user=cls.users[user], author=cls.users[author]
+                )
+
+    def setUp(self):
+        cache.clear()
+        suggestions.rebuild()
+
+    def suggested(self, name):
+        return [
+            (suggestion.author.username, suggestion.score)
+            for suggestion in FollowSuggestion.objects.filter(
+                user=FollowSuggestionTests.users[name]
+            )
+        ]
+
+    def test_co_follow_scores(self):
+        """Авторы подписок пользователя, кроме него самого и его подписок."""
+        self.assertEqual(
+            self.suggested('reader'), [('common', 2), ('rare', 1)]
+        )
+        self.assertEqual(self.suggested('left'), [])
+
+    @mock.patch.object(suggestions, 'SUGGESTIONS_TOP_K', 1)
+    def test_top_k(self):
+        suggestions.rebuild()
+        self.assertEqual(self.suggested('reader'), [('common', 2)])
+
+    def test_refresh_after_follow(self):
+        """Новая подписка меняет рекомендации подписчиков пользователя."""
+        users = FollowSuggestionTests.users
+        with mock.patch('posts.signals.run_in_background') as run:
+            Follow.objects.create(user=users['right'], author=users['rare'])
+        run.assert_called_once_with(
+            suggestions.refresh_after_follow, users['right'].id
+        )
+        suggestions.refresh_after_follow(users['right'].id)
+        self.assertEqual(
+            self.suggested('reader'), [('common', 2), ('rare', 2)]
+        )
+
+    def test_pages_show_suggestions(self):
+        client = Client()
+        client.force_login(FollowSuggestionTests.users['reader'])
+        for url in (
+            reverse('posts:follow_index'),
+            reverse('posts:profile', args=['reader']),
+        ):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(len(response.context['suggestions']), 2)
+                self.assertContains(response, 'Кого почитать')
+        response = client.get(reverse('posts:profile', args=['left']))
+        self.assertNotContains(response, 'Кого почитать')
+
+    def test_api(self):
+        client = APIClient()
+        url = '/api/v1/suggestions/'
+        self.assertEqual(client.get(url).status_code, 401)
+        client.force_authenticate(FollowSuggestionTests.users['reader'])
+        data = client.get(url).json()
+        self.assertEqual(
+            [(item['username'], item['score']) for item in data],
+            [('common', 2), ('rare', 1)],
+        )
@@ -0,0 +1,76 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(PostThumbnailsTests.user)
+
+    def create_post(self):
+        return Post.objects.create(
+            text='Пост с картинкой',
+            author=PostThumbnailsTests.user,
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=PostThumbnailsTests.small_gif,
+                content_type='image/gif',
+            ),
+        )
+
+    def test_saving_image_queues_thumbnails(self):
+        """Загрузка картинки ставит миниатюры в фоновую очередь."""
+        with mock.patch.object(thumbnails, 'run_in_background') as run:
+            post = self.create_post()
+        run.assert_called_once_with(thumbnails.generate_thumbnails, post.id)
+
+    def test_original_shown_until_thumbnail_ready(self):
+        """Пока миниатюры нет, страницы показывают оригинал картинки."""
+        post = self.create_post()
+        url = reverse('posts:post_detail', kwargs={'post_id': post.id})
+
+        response = self.authorized_client.get(url)
+        self.assertContains(response, post.image.url)
+        self.assertNotContains(response, settings.MEDIA_URL + 'cache/')
+
+        thumbnails.generate_thumbnails(post.id)
+        response = self.authorized_client.get(url)
+        self.assertNotContains(response, f'src="{post.image.url}"')
+        self.assertContains(response, settings.MEDIA_URL + 'cache/')
+        self.assertEqual(
+            Post.objects.get(pk=post.pk).version, post.version + 1
+        )
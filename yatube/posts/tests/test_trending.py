@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import trending
+from ..models import Comment, Follow, Post, TrendingPost
+
+User = get_user_model()
+
+HALF_LIFE = timedelta(hours=trending.TRENDING_HALF_LIFE_HOURS)
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.quiet = Post.objects.create(text='Тихий', author=self.author)
+        self.busy = Post.objects.create(text='Обсуждаемый', author=self.author)
+
+    def comment(self, post):
+        return Comment.objects.create(
+            post=post, author=TrendingTests.reader, text='Комментарий'
+        )
+
+    def ranking(self):
+        return list(TrendingPost.objects.values_list('post_id', flat=True))
+
+    def test_comments_rank_posts(self):
+        self.comment(self.quiet)
+        for _ in range(3):
+            self.comment(self.busy)
+        self.assertEqual(self.ranking(), [self.busy.id, self.quiet.id])
+        self.assertAlmostEqual(
+            TrendingPost.objects.get(post=self.busy).score, 3, places=3
+        )
+
+    def test_old_activity_decays(self):
+        """Три комментария двое суток назад весят меньше одного сейчас."""
+        now = timezone.now()
+        for _ in range(3):
+            trending.record(self.busy.id, 1, now=now - 2 * HALF_LIFE)
+        trending.record(self.quiet.id, 1, now=now)
+        self.assertEqual(self.ranking(), [self.quiet.id, self.busy.id])
+        trending.record(self.busy.id, 1, now=now)
+        row = TrendingPost.objects.get(post=self.busy)
+        self.assertAlmostEqual(row.score, 3 / 4 + 1)
+        self.assertEqual(self.ranking(), [self.busy.id, self.quiet.id])
+
+    def test_decay_removes_faded_posts(self):
+        now = timezone.now()
+        trending.record(self.busy.id, 1, now=now - 10 * HALF_LIFE)
+        trending.record(self.quiet.id, 1, now=now)
+        self.assertEqual(trending.decay(now=now), 1)
+        self.assertEqual(self.ranking(), [self.quiet.id])
+
+    def test_comment_deletion(self):
+        comment = self.comment(self.quiet)
+        comment.delete()
+        self.assertEqual(self.ranking(), [])
+        self.comment(self.busy)
+        self.busy.delete()
+        self.assertEqual(self.ranking(), [])
+
+    def test_follow_boosts_latest_post(self):
+        Follow.objects.create(
+            user=TrendingTests.reader, author=TrendingTests.author
+        )
+        self.assertEqual(self.ranking(), [self.busy.id])
+
+    def test_old_events_removed_with_decayed_weight(self):
+        """Удаление вычитает оставшийся вклад, а не полный вес."""
+        old = self.comment(self.busy)
+        follow = Follow.objects.create(
+            user=TrendingTests.reader, author=TrendingTests.author
+        )
+        moment = timezone.now() - HALF_LIFE
+        Post.objects.update(pub_date=moment - timedelta(minutes=1))
+        Comment.objects.filter(pk=old.pk).update(pub_date=moment)
+        Follow.objects.filter(pk=follow.pk).update(created=moment)
+        trending.rebuild()
+        self.comment(self.busy)
+        row = TrendingPost.objects.get(post=self.busy)
+        self.assertAlmostEqual(
+            row.score, (1 + trending.TRENDING_FOLLOW_WEIGHT) / 2 + 1,
+            places=3,
+        )
+        Comment.objects.get(pk=old.pk).delete()
+        Follow.objects.get(pk=follow.pk).delete()
+        row = TrendingPost.objects.get(post=self.busy)
+        self.assertAlmostEqual(row.score, 1, places=3)
+
+    def test_rebuild_matches_incremental(self):
+        for _ in range(2):
+            self.comment(self.busy)
+        self.comment(self.quiet)
+        Follow.objects.create(
+            user=TrendingTests.reader, author=TrendingTests.author
+        )
+        incremental = dict(TrendingPost.objects.values_list('post', 'score'))
+        trending.rebuild()
+        rebuilt = dict(TrendingPost.objects.values_list('post', 'score'))
+        self.assertEqual(incremental.keys(), rebuilt.keys())
+        for post_id, score in incremental.items():
+            self.assertAlmostEqual(rebuilt[post_id], score, places=3)
+
+    def test_popular_page_and_api(self):
+        self.comment(self.quiet)
+        for _ in range(2):
+            self.comment(self.busy)
+        response = Client().get(reverse('posts:popular'))
+        self.assertEqual(
+            [post.id for post in response.context['page_obj']],
+            [self.busy.id, self.quiet.id],
+        )
+        data = APIClient().get('/api/v1/posts/popular/').json()
+        self.assertEqual(
+            [post['id'] for post in data['results']],
+            [self.busy.id, self.quiet.id],
+        )
+        self.comment(self.quiet)
+        self.comment(self.quiet)
+        response = Client().get(reverse('posts:popular'))
+        self.assertEqual(
+            response.context['page_obj'][0].id, self.quiet.id
+        )
@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 
@@ -6,7 +7,9 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from yatube.settings import PAGINATOR_OBJECTS_ON_PAGE
 
@@ -36,6 +39,10 @@ class PostsWiewsTests(TestCase):
             b'\x0A\x00\x3B'
         )
         cls.gif_name = 'small.gif'
+        # Картинки хранятся под хэшем содержимого.
+        cls.image_name = (
+            'posts/' + hashlib.sha256(cls.small_gif).hexdigest() + '.gif'
+        )
         cls.uploaded = SimpleUploadedFile(
             name=cls.gif_name,
             content=cls.small_gif,
@@ -142,7 +149,7 @@ class PostsWiewsTests(TestCase):
         """Шаблоны posts сформированы с правильными контекстами"""
         post = PostsWiewsTests.post
         user = PostsWiewsTests.user
-        gif_name = PostsWiewsTests.gif_name
+        image_name = PostsWiewsTests.image_name
 
         for response in self.url_names_response_context_check.values():
             first_object = response.context['page_obj'][0]
@@ -155,14 +162,14 @@ class PostsWiewsTests(TestCase):
             self.assertEqual(post_id_0, post.id)
             self.assertEqual(post_author_username_0, user.username)
             self.assertEqual(post_group_id_0, post.id)
-            self.assertEqual(post_image_name_0, f'posts/{gif_name}')
+            self.assertEqual(post_image_name_0, image_name)
 
     def test_page_post_detail_correct_context(self):
         """Шаблон post_detail сформирован с правильным контекстом."""
         post = PostsWiewsTests.post
         user = PostsWiewsTests.user
         group = PostsWiewsTests.group
-        gif_name = PostsWiewsTests.gif_name
+        image_name = PostsWiewsTests.image_name
         comment = PostsWiewsTests.comment
 
         response = self.authorized_client.get(
@@ -173,8 +180,7 @@ class PostsWiewsTests(TestCase):
         self.assertEqual(response.context.get('post').author.id, user.id)
         self.assertEqual(response.context.get('post').group.id, group.id)
         self.assertEqual(
-            response.context.get('post').image.name,
-            f'posts/{gif_name}'
+            response.context.get('post').image.name, image_name
         )
 
         self.assertEqual(
@@ -326,6 +332,8 @@ class PaginatorViewsTest(TestCase):
             )
 
     def setUp(self):
+        cache.clear()
+
         user = PaginatorViewsTest.user
         group = PaginatorViewsTest.group
 
@@ -384,3 +392,50 @@ class PaginatorViewsTest(TestCase):
                     len(response.context['page_obj']),
                     paginator_objects_on_last_page
                 )
+
+    def test_page_number_out_of_range(self):
+        """Огромный номер страницы даёт пустую страницу, а не ошибку."""
+        response = self.client.get(
+            reverse('posts:index'), {'page': '9' * 30}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_cursor_pages_walk_all_posts(self):
+        """Курсоры ведут по всем постам вперёд и назад без повторов."""
+        posts = list(Post.objects.values_list('id', flat=True))
+        url = reverse('posts:index')
+
+        first_page = self.authorized_client.get(url).context['page_obj']
+        second_page = self.authorized_client.get(
+            url, {'after': first_page.next_cursor}
+        ).context['page_obj']
+        self.assertFalse(second_page.has_next())
+        self.assertEqual(
+            [post.id for post in first_page]
+            + [post.id for post in second_page],
+            posts
+        )
+
+        previous_page = self.authorized_client.get(
+            url, {'before': second_page.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(
+            [post.id for post in previous_page],
+            [post.id for post in first_page]
+        )
+        self.assertFalse(previous_page.has_previous())
+
+    def test_cursor_pages_skip_count_and_offset(self):
+        """Курсорная страница не считает посты и не использует OFFSET."""
+        page = self.authorized_client.get(
+            reverse('posts:index')
+        ).context['page_obj']
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(
+                reverse('posts:index'), {'after': page.next_cursor}
+            )
+        for query in queries.captured_queries:
+            with self.subTest(sql=query['sql']):
+                self.assertNotIn('COUNT(', query['sql'])
+                self.assertNotIn('OFFSET', query['sql'])
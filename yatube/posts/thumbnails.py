@@ -0,0 +1,67 @@
+"""Миниатюры картинок постов.
+
+Миниатюры создаются в фоне сразу после загрузки картинки, а шаблоны
+только ищут готовую миниатюру и до её появления показывают оригинал.
+"""
+from core.profiling import timed
+from core.tasks import run_in_background
+from django.db.models import F
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+from yatube.settings import POST_IMAGE_THUMBNAILS
+
+from . import caching
+from .models import Post
+
+
+class LookupThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl, который находит миниатюру, но не создаёт её."""
+
+    def get_existing_thumbnail(self, file_, geometry_string, **options):
+        """Готовая миниатюра или ``None``, если её ещё нет."""
+        source = ImageFile(file_)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+lookup_backend = LookupThumbnailBackend()
+
+
+def thumbnail_url(image, geometry_string, **options):
+    """URL готовой миниатюры, а пока её нет — URL оригинала."""
+    if not image:
+        return ''
+    with timed('thumb'):
+        thumbnail = lookup_backend.get_existing_thumbnail(
+            image, geometry_string, **options
+        )
+    return thumbnail.url if thumbnail else image.url
+
+
+def generate_thumbnails(post_id):
+    """Создаёт миниатюры картинки поста для всех размеров шаблонов."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    for geometry_string, options in POST_IMAGE_THUMBNAILS:
+        get_thumbnail(post.image, geometry_string, **options)
+    # Карточки и страницы с оригиналом картинки больше не актуальны.
+    Post.objects.filter(pk=post_id).update(version=F('version') + 1)
+    caching.bump(*caching.post_scopes(post))
+
+
+def queue_thumbnails(post):
+    """Ставит создание миниатюр поста в очередь фоновых задач."""
+    if post.image:
+        run_in_background(generate_thumbnails, post.id)
@@ -0,0 +1,179 @@
+"""Рейтинг популярных постов с экспоненциальным затуханием.
+
+Комментарий добавляет посту ``TRENDING_COMMENT_WEIGHT``, новый
+подписчик автора — ``TRENDING_FOLLOW_WEIGHT`` его последнему посту;
+удаление комментария и отписка вычитают то, что к этому моменту
+осталось от их вклада. Вклад события уменьшается вдвое каждые
+``TRENDING_HALF_LIFE_HOURS`` часов.
+
+Пересчитывать затухание всех постов при каждом запросе не нужно:
+строка хранит вес на момент последнего обновления и ранг
+``ln(вес) + время / tau``. Порядок рангов совпадает с порядком текущих
+весов в любой момент, поэтому страница читает рейтинг по индексу,
+а событие обновляет одну строку. Периодический проход ``decay_trending``
+только удаляет посты, чей текущий вес затух ниже ``TRENDING_MIN_SCORE``.
+"""
+import math
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from yatube.settings import (TRENDING_COMMENT_WEIGHT, TRENDING_FOLLOW_WEIGHT,
+                             TRENDING_HALF_LIFE_HOURS, TRENDING_MIN_SCORE)
+
+from . import caching
+from .models import Comment, Follow, Post, TrendingPost
+
+TAU = TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+SCOPE = 'trending'
+
+
+def decayed(score, since, now):
+    """Вес ``score`` на момент ``since``, затухший к ``now``."""
+    return score * math.exp(-(now - since).total_seconds() / TAU)
+
+
+def rank(score, moment):
+    return math.log(score) + moment.timestamp() / TAU
+
+
+def since(weight, now):
+    """Момент, раньше которого вклад ``weight`` затух ниже порога."""
+    return now - timedelta(
+        seconds=TAU * math.log(weight / TRENDING_MIN_SCORE)
+    )
+
+
+def min_rank(now):
+    """Ранг, ниже которого текущий вес меньше ``TRENDING_MIN_SCORE``."""
+    return rank(TRENDING_MIN_SCORE, now)
+
+
+def record(post_id, weight, now=None):
+    """Добавляет к весу поста ``weight`` на момент ``now``."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        row = TrendingPost.objects.filter(post_id=post_id).first()
+        if row is None:
+            if weight <= 0:
+                # Удаление у поста вне рейтинга: в том числе каскадное
+                # при удалении поста, строку создавать нельзя.
+                return
+            score = weight
+        else:
+            score = decayed(row.score, row.updated, now) + weight
+        if score < TRENDING_MIN_SCORE:
+            TrendingPost.objects.filter(post_id=post_id).delete()
+        else:
+            TrendingPost.objects.update_or_create(
+                post_id=post_id,
+                defaults={
+                    'score': score,
+                    'updated': now,
+                    'rank': rank(score, now),
+                },
+            )
+    caching.bump(SCOPE)
+
+
+def comment_added(comment):
+    record(comment.post_id, TRENDING_COMMENT_WEIGHT)
+
+
+def comment_removed(comment):
+    now = timezone.now()
+    weight = decayed(TRENDING_COMMENT_WEIGHT, comment.pub_date, now)
+    record(comment.post_id, -weight, now)
+
+
+def followed_posts(author, moment):
+    """Последний пост автора к моменту подписки: ему достаётся её вес."""
+    return Post.objects.filter(author=author, pub_date__lte=moment)
+
+
+def follow_added(follow):
+    post_id = followed_posts(
+        follow.author_id, follow.created
+    ).values_list('id', flat=True).first()
+    if post_id is not None:
+        record(post_id, TRENDING_FOLLOW_WEIGHT)
+
+
+def follow_removed(follow):
+    if follow.created is None:
+        # Подписка старше поля ``created``: её вклад не вычислить,
+        # он и так затухает со временем.
+        return
+    post_id = followed_posts(
+        follow.author_id, follow.created
+    ).values_list('id', flat=True).first()
+    if post_id is not None:
+        now = timezone.now()
+        weight = decayed(TRENDING_FOLLOW_WEIGHT, follow.created, now)
+        record(post_id, -weight, now)
+
+
+def decay(now=None):
+    """Удаляет затухшие посты и возвращает их число."""
+    now = now or timezone.now()
+    deleted, _ = TrendingPost.objects.filter(rank__lt=min_rank(now)).delete()
+    if deleted:
+        caching.bump(SCOPE)
+    return deleted
+
+
+def rebuild(now=None):
+    """Собирает рейтинг заново по недавним комментариям и подпискам.
+
+    Подписки без даты (оформленные до появления поля ``created``)
+    не учитываются.
+    """
+    now = now or timezone.now()
+    events = []
+    comments = Comment.objects.filter(
+        pub_date__gte=since(TRENDING_COMMENT_WEIGHT, now)
+    ).order_by()
+    for post_id, pub_date in comments.values_list('post_id', 'pub_date'):
+        events.append((post_id, TRENDING_COMMENT_WEIGHT, pub_date))
+    follows = Follow.objects.filter(
+        created__gte=since(TRENDING_FOLLOW_WEIGHT, now)
+    ).annotate(
+        post_id=Subquery(
+            followed_posts(OuterRef('author'), OuterRef('created'))
+            .values('id')[:1]
+        )
+    ).order_by()
+    for post_id, created in follows.values_list('post_id', 'created'):
+        if post_id is not None:
+            events.append((post_id, TRENDING_FOLLOW_WEIGHT, created))
+    scores = {}
+    for post_id, weight, moment in events:
+        scores[post_id] = scores.get(post_id, 0.0) + decayed(
+            weight, moment, now
+        )
+    with transaction.atomic():
+        TrendingPost.objects.all().delete()
+        TrendingPost.objects.bulk_create(
+            TrendingPost(
+                post_id=post_id,
+                score=score,
+                updated=now,
+                rank=rank(score, now),
+            )
+            for post_id, score in scores.items()
+            if score >= TRENDING_MIN_SCORE
+        )
+    caching.bump(SCOPE)
+
+
+def posts():
+    """Посты рейтинга, самые популярные первыми."""
+    return TrendingPost.objects.select_related(
+        'post__author', 'post__group'
+    )
+
+
+def as_posts(objects):
+    return [row.post for row in objects]
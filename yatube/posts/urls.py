@@ -6,6 +6,14 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('popular/', views.popular, name='popular'),
+    path('groups/', views.groups, name='groups'),
+    path('group/<slug:slug>/', views.group_posts, name='group_number'),
+    path(
+        'group/<slug:slug>/stream/',
+        views.group_stream,
+        name='group_stream'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -17,6 +25,11 @@ urlpatterns = [
         name='profile_unfollow'
     ),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
@@ -31,5 +44,7 @@ urlpatterns = [
     path('posts/<int:post_id>/delete/', views.post_delete, name='post_delete'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
+    path('search/', views.post_search, name='search'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/stream/', views.follow_stream, name='follow_stream'),
 ]
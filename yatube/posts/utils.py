@@ -1,6 +1,16 @@
+import base64
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
+from django.db.models import Q
 from yatube.settings import PAGINATOR_OBJECTS_ON_PAGE
 
+# Больший номер страницы дал бы OFFSET, который не помещается
+# в 64-битное целое SQLite; такие страницы всё равно пусты.
+MAX_PAGE_NUMBER = 10 ** 9
+
 
 def paginator(request, objects, *args):
     paginator = Paginator(objects, PAGINATOR_OBJECTS_ON_PAGE)
@@ -8,3 +18,138 @@ def paginator(request, objects, *args):
     page_obj = paginator.get_page(page_number)
 
     return page_obj
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = None
+        self.previous_cursor = None
+        if has_next and object_list:
+            self.next_cursor = paginator.encode(object_list[-1])
+        if has_previous and object_list:
+            self.previous_cursor = paginator.encode(object_list[0])
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Курсорная пагинация по полям сортировки queryset.
+
+    Страница выбирается условием на ключ сортировки, а не ``OFFSET``,
+    и без ``COUNT(*)``, поэтому любая страница стоит как первая.
+    Сортировка queryset должна быть однозначной, например
+    ``('-pub_date', '-id')``.
+    """
+    is_keyset = True
+
+    def __init__(self, objects, per_page):
+        self.objects = objects
+        self.per_page = per_page
+        ordering = objects.query.order_by or objects.model._meta.ordering
+        self.ordering = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+
+    def encode(self, obj):
+        values = [
+            self._field(name).value_to_string(obj)
+            for name, _ in self.ordering
+        ]
+        return base64.urlsafe_b64encode(
+            json.dumps(values).encode()
+        ).decode()
+
+    def decode(self, cursor):
+        """Значения ключа из курсора или ``None``, если курсор испорчен."""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.ordering):
+                return None
+            return [
+                self._field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    def _field(self, name):
+        opts = self.objects.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def _seek(self, values, forward):
+        """Условие «строго после ключа» в направлении сортировки."""
+        condition = Q()
+        for i, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending == forward else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[i]})
+            for (prev_name, _), value in zip(self.ordering[:i], values):
+                step &= Q(**{prev_name: value})
+            condition |= step
+        return condition
+
+    def page(self, after=None, before=None, number=None):
+        """Страница после курсора ``after``, перед ``before`` или по номеру.
+
+        Номер страницы поддерживается для старых ссылок ``?page=``
+        и выбирается через ``OFFSET``.
+        """
+        size = self.per_page
+        if before is not None:
+            order = [
+                name if descending else f'-{name}'
+                for name, descending in self.ordering
+            ]
+            rows = list(
+                self.objects.filter(self._seek(before, forward=False))
+                .order_by(*order)[:size + 1]
+            )
+            return KeysetPage(
+                rows[:size][::-1], self,
+                has_next=True, has_previous=len(rows) > size,
+            )
+        objects = self.objects
+        start = 0
+        if after is not None:
+            objects = objects.filter(self._seek(after, forward=True))
+        elif number is not None:
+            start = (number - 1) * size
+        rows = list(objects[start:start + size + 1])
+        return KeysetPage(
+            rows[:size], self,
+            has_next=len(rows) > size,
+            has_previous=after is not None or start > 0,
+        )
+
+
+def cursor_paginator(request, objects):
+    """Курсорная пагинация для ``?after=``, ``?before=`` и ``?page=``."""
+    paginator = KeysetPaginator(objects, PAGINATOR_OBJECTS_ON_PAGE)
+    after = request.GET.get('after')
+    if after:
+        return paginator.page(after=paginator.decode(after))
+    before = request.GET.get('before')
+    if before:
+        return paginator.page(before=paginator.decode(before))
+    try:
+        number = int(request.GET.get('page', 1))
+    except ValueError:
+        number = 1
+    number = min(max(number, 1), MAX_PAGE_NUMBER)
+    return paginator.page(number=number)
@@ -1,18 +1,28 @@
+from core.db import serialized_write
+from core.routers import read_from_replica
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from yatube.settings import NUMBER_VISIBLE_LINES_IN_POSTCARD
+from yatube.settings import (COMMENTS_ON_PAGE, EVENTS_LIVE,
+                             NUMBER_VISIBLE_LINES_IN_POSTCARD,
+                             PAGINATOR_OBJECTS_ON_PAGE, SUGGESTIONS_ON_PAGE)
 
+from . import events, feed, suggestions, trending
+from . import search as search_index
+from .caching import cache_anonymous_page, conditional_page
 from .forms import CommentForm, PostForm
 from .models import Comment, Follow, Group, Post, User
-from .utils import paginator
+from .utils import KeysetPaginator, cursor_paginator, paginator
 
 
+@conditional_page('all')
+@cache_anonymous_page('all')
 def index(request):
     template = 'posts/index.html'
 
-    posts = Post.objects.all()
+    posts = Post.objects.select_related('author', 'group')
 
-    page_obj = paginator(request, posts)
+    page_obj = cursor_paginator(request, posts)
 
     context = {
         'visible_lines': NUMBER_VISIBLE_LINES_IN_POSTCARD,
@@ -21,61 +31,102 @@ def index(request):
     return render(request, template, context=context)
 
 
+@conditional_page('all', trending.SCOPE)
+@cache_anonymous_page('all', trending.SCOPE)
+def popular(request):
+    page_obj = cursor_paginator(request, trending.posts())
+    page_obj.object_list = trending.as_posts(page_obj.object_list)
+    context = {
+        'visible_lines': NUMBER_VISIBLE_LINES_IN_POSTCARD,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/popular.html', context)
+
+
+@conditional_page('group:{slug}')
+@cache_anonymous_page('group:{slug}')
 def group_posts(request, slug):
     template = 'posts/group_list.html'
 
     group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
+    posts = Post.objects.filter(group=group).select_related(
+        'author', 'group'
+    )
 
-    page_obj = paginator(request, posts)
+    page_obj = cursor_paginator(request, posts)
 
     context = {
         'visible_lines': NUMBER_VISIBLE_LINES_IN_POSTCARD,
         'group': group,
         'page_obj': page_obj,
+        'live': _live(request),
     }
     return render(request, template, context=context)
 
 
+@conditional_page('author:{username}')
 def profile(request, username):
     template = 'posts/profile.html'
     following = False
     author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    page_obj = paginator(request, posts)
-    count = posts.count()
+    posts = author.posts.select_related('author', 'group')
+    page_obj = cursor_paginator(request, posts)
     following = False
     if request.user.is_authenticated:
         following = Follow.objects.filter(
             user=request.user,
             author=author
         ).exists()
+    follow_suggestions = ()
+    if request.user.id == author.id:
+        follow_suggestions = suggestions.for_user(author, SUGGESTIONS_ON_PAGE)
 
     context = {
         'visible_lines': NUMBER_VISIBLE_LINES_IN_POSTCARD,
         'following': following,
-        'count': count,
+        'count': author.posts_count,
         'author': author,
         'page_obj': page_obj,
+        'suggestions': follow_suggestions,
     }
     return render(request, template, context)
 
 
+@read_from_replica
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    comments = Comment.objects.filter(post=post.id)
-    count = Post.objects.filter(author=post.author.id).count()
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), id=post_id
+    )
+    comments = KeysetPaginator(
+        post.comments.select_related('author'), COMMENTS_ON_PAGE
+    ).page()
     form = CommentForm()
     context = {
         'form': form,
-        'count': count,
+        'count': post.author.posts_count,
         'post': post,
         'comments': comments,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@conditional_page('comments:{post_id}')
+def post_comments(request, post_id):
+    """Порция более старых комментариев поста после курсора ``after``."""
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    paginator = KeysetPaginator(
+        post.comments.select_related('author'), COMMENTS_ON_PAGE
+    )
+    after = paginator.decode(request.GET.get('after', ''))
+    context = {
+        'post': post,
+        'comments': paginator.page(after=after),
+    }
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
 @login_required
+@serialized_write()
 def post_create(request):
     context = {
         'form': None,
@@ -95,10 +146,11 @@ def post_create(request):
 
 
 @login_required
+@serialized_write()
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.select_related('group'), id=post_id)
 
-    if request.user.id != post.author.id:
+    if request.user.id != post.author_id:
         return redirect('posts:post_detail', post.id)
 
     context = {
@@ -125,15 +177,17 @@ def post_edit(request, post_id):
 
 
 @login_required
+@serialized_write(all_methods=True)
 def post_delete(request, post_id):
     post = get_object_or_404(Post, id=post_id)
-    if request.user.id != post.author.id:
+    if request.user.id != post.author_id:
         return redirect('posts:post_detail', post_id)
     post.delete()
     return redirect('posts:profile', request.user.username)
 
 
 @login_required
+@serialized_write()
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
@@ -145,14 +199,35 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@serialized_write(all_methods=True)
 def delete_comment(request, post_id, comment_id):
     post = get_object_or_404(Post, id=post_id)
     comment = get_object_or_404(Comment, id=comment_id, post=post)
-    if request.user.id == comment.author.id:
+    if request.user.id == comment.author_id:
         comment.delete()
     return redirect('posts:post_detail', post_id)
 
 
+@read_from_replica
+def post_search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    hits, next_cursor = search_index.search_posts(
+        query, PAGINATOR_OBJECTS_ON_PAGE, after=request.GET.get('after')
+    )
+    post_ids = [hit['post_id'] for hit in hits]
+    posts = Post.objects.select_related('author', 'group').in_bulk(post_ids)
+
+    context = {
+        'visible_lines': NUMBER_VISIBLE_LINES_IN_POSTCARD,
+        'query': query,
+        'posts': [posts[post_id] for post_id in post_ids if post_id in posts],
+        'next_cursor': next_cursor,
+    }
+    return render(request, template, context)
+
+
+@read_from_replica
 def groups(request):
     template = 'posts/groups.html'
     groups = Group.objects.all()
@@ -166,21 +241,80 @@ def groups(request):
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
-    posts_list = Post.objects.filter(
-        author__following__user=request.user
-    )
-    posts_exist = posts_list.exists()
-    page_obj = paginator(request, posts_list)
+    posts_list = feed.get_feed(request.user)
+    page_obj = cursor_paginator(request, posts_list)
+    page_obj.object_list = feed.as_posts(page_obj.object_list)
+    posts_exist = bool(page_obj.object_list)
     context = {
         'visible_lines': NUMBER_VISIBLE_LINES_IN_POSTCARD,
         'posts_exist': posts_exist,
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'live': _live(request),
+        'suggestions': suggestions.for_user(
+            request.user, SUGGESTIONS_ON_PAGE
+        ),
     }
     return render(request, 'posts/follow.html', context)
 
 
+def _live(request):
+    """Подписывать ли страницу на поток новых постов."""
+    return EVENTS_LIVE and request.user.is_authenticated
+
+
+def _last_event_id(request):
+    value = (
+        request.META.get('HTTP_LAST_EVENT_ID')
+        or request.GET.get('last_id')
+    )
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _event_stream(request, channels, **filters):
+    """Ответ Server-Sent Events с новыми постами."""
+    if not EVENTS_LIVE:
+        raise Http404
+    last_id = _last_event_id(request)
+    if last_id is None:
+        last_id = events.last_post_id()
+    response = StreamingHttpResponse(
+        events.stream(channels, last_id, **filters),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Иначе nginx копит события в буфере.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+def group_stream(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return _event_stream(
+        request, [events.group_channel(group.id)], group_id=group.id
+    )
+
+
+@login_required
+def follow_stream(request):
+    authors = list(
+        Follow.objects.filter(user=request.user)
+        .values_list('author_id', flat=True)
+    )
+    return _event_stream(
+        request,
+        [events.author_channel(author_id) for author_id in authors],
+        author_id__in=authors,
+    )
+
+
 @login_required
+@serialized_write(all_methods=True)
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if request.user.id == author.id:
@@ -195,6 +329,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@serialized_write(all_methods=True)
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     if request.user.id == author.id:
@@ -1,11 +1,14 @@
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 SECRET_KEY = 'ac^m&wgiyek@jlcfd07bq4z&z(hx-&v0k)-#kpcqxd39vv6&*f'
 
-DEBUG = True
+# DEBUG=0 для production: с DEBUG ссылки на статику идут без хэша
+DEBUG = os.environ.get('DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -34,11 +37,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.ReplicaStickinessMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.UserSnapshotMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -73,6 +79,53 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения: пути к файлам SQLite через запятую.
+# Для локальной проверки их обновляет команда sync_replica.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Тесты не пишут в файлы счётчиков сервера (core.runner)
+TEST_RUNNER = 'core.runner.TestRunner'
+
+# Профиль базы: production включает WAL, настройки PRAGMA, постоянные
+# соединения и очередь транзакций записи (core.db)
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'development')
+
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 10000,
+    'temp_store': 'MEMORY',
+}
+
+SQLITE_PRAGMAS = {}
+
+SQLITE_SERIALIZE_WRITES = False
+
+SQLITE_WRITE_LOCK = os.path.join(BASE_DIR, 'db.sqlite3.lock')
+
+if DATABASE_PROFILE == 'production':
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+    SQLITE_SERIALIZE_WRITES = True
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+    DATABASES['default']['OPTIONS'] = {'timeout': 10}
+
+# Сколько секунд после записи пользователь читает из основной базы
+REPLICA_STICKY_SECONDS = 5
+
+REPLICA_STICKY_COOKIE = 'read_primary'
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -109,6 +162,34 @@ STATICFILES_DIRS = [
 ]
 
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+
+
+# STATIC_PIPELINE=1: collectstatic пишет файлы с хэшем содержимого
+# в имени и их сжатые копии, {% static %} ссылается на хэшированные
+# имена, а сайт сам раздаёт статику с заголовками бессрочного кэша.
+# Перед запуском с ним нужен manage.py collectstatic.
+STATIC_PIPELINE = os.environ.get('STATIC_PIPELINE') == '1'
+if STATIC_PIPELINE and DEBUG:
+    # С DEBUG {% static %} отдаёт имена без хэша, и бессрочный кэш
+    # нечем сбросить.
+    raise ImproperlyConfigured('STATIC_PIPELINE=1 требует DEBUG=0')
+
+STATICFILES_STORAGE = (
+    'core.storage.CompressedManifestStaticFilesStorage' if STATIC_PIPELINE
+    else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+)
+
+STATIC_COMPRESSED_EXTENSIONS = {
+    '.css', '.js', '.svg', '.ico', '.map', '.json', '.txt', '.html',
+}
+
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Файлы без хэша в имени (например, из прямых ссылок) проверяются чаще.
+STATIC_MAX_AGE = 60 * 60
+
+
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
 
@@ -128,6 +209,55 @@ PAGINATOR_OBJECTS_ON_PAGE = 10
 
 NUMBER_VISIBLE_LINES_IN_POSTCARD = 300
 
+# Комментариев на странице поста и в одной догружаемой порции
+COMMENTS_ON_PAGE = 20
+
+# Лента подписок: авторы с большим числом подписчиков не рассылаются
+FEED_FANOUT_MAX_FOLLOWERS = 5000
+
+FEED_BACKFILL_LIMIT = 1000
+
+FEED_BATCH_SIZE = 500
+
+# Рекомендации подписок: сколько авторов хранить и показывать,
+# размер пачки пересчёта и предел подписчиков для фонового пересчёта
+SUGGESTIONS_TOP_K = 20
+
+SUGGESTIONS_ON_PAGE = 5
+
+SUGGESTIONS_CHUNK_SIZE = 500
+
+SUGGESTIONS_REFRESH_MAX_FOLLOWERS = 1000
+
+# Рейтинг популярных постов: период полураспада веса, веса событий
+# и вес, ниже которого пост выбывает из рейтинга
+TRENDING_HALF_LIFE_HOURS = 24
+
+TRENDING_COMMENT_WEIGHT = 1.0
+
+TRENDING_FOLLOW_WEIGHT = 2.0
+
+TRENDING_MIN_SCORE = 0.05
+
+# Поток новых постов (SSE): memory — брокер в процессе,
+# polling — опрос базы для нескольких процессов
+EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND', 'memory')
+
+# Поток держит соединение и поток сервера, поэтому он выключен, пока
+# сайт не обслуживает асинхронный или многопоточный сервер. Подписка
+# только для вошедших: страницы анонимов кэшируются целиком.
+EVENTS_LIVE = os.environ.get('EVENTS_LIVE') == '1'
+
+EVENTS_POLL_SECONDS = 2
+
+EVENTS_HEARTBEAT_SECONDS = 15
+
+EVENTS_MAX_SECONDS = 120
+
+EVENTS_RETRY_MS = 3000
+
+EVENTS_BATCH_SIZE = 20
+
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
@@ -136,6 +266,28 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Размеры миниатюр картинок постов, которые используют шаблоны;
+# они создаются в фоне сразу после загрузки картинки
+POST_IMAGE_THUMBNAILS = [
+    ('1920x1920', {'crop': 'center', 'upscale': True}),
+]
+
+BACKGROUND_TASKS_WORKERS = 2
+
+# Сколько секунд после записи или повторной загрузки файл картинки без
+# ссылок не удаляется: новый пост ещё может сослаться на него (posts.blobs)
+IMAGE_BLOB_GRACE_SECONDS = 60
+
+
+# Страницы для анонимных пользователей сбрасываются счётчиками поколений,
+# таймаут лишь вытесняет устаревшие ключи
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Поколения кэша страниц, общие для процессов сервера (posts.caching)
+CACHE_GENERATIONS_DATABASE = os.environ.get(
+    'CACHE_GENERATIONS_DATABASE',
+    os.path.join(BASE_DIR, 'generations.sqlite3'),
+)
 
 CACHES = {
     'default': {
@@ -143,22 +295,75 @@ CACHES = {
     }
 }
 
+# Кэш общий для процессов сервера. Только с ним в кэше можно держать
+# сессии и снимки пользователей: с LocMemCache выход или смена пароля
+# в одном процессе не видны другим
+CACHE_SHARED = not CACHES['default']['BACKEND'].endswith('.LocMemCache')
+
+# Хранилище сессий: db по умолчанию, signed_cookies хранит сессию в cookie,
+# cached_db читает её из кэша и обращается к базе только при промахе
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'db')
+if SESSION_BACKEND == 'cached_db' and not CACHE_SHARED:
+    raise ImproperlyConfigured(
+        'SESSION_BACKEND=cached_db требует кэша, общего для процессов'
+    )
+
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_BACKEND}'
+
+# Сколько секунд пользователь запроса берётся из кэша (core.auth);
+# снимки включаются только с CACHE_SHARED
+USER_SNAPSHOT_TIMEOUT = 60
+
+# Профилирование запросов: доля замеряемых запросов (0 — выключено),
+# порог медленного запроса в мс и журнал медленных запросов
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+
+PROFILING_SLOW_MS = 500
+
+PROFILING_SLOW_LOG = os.path.join(BASE_DIR, 'logs', 'slow_requests.jsonl')
+
+PROFILING_MAX_SQL = 200
+
+# Наибольшее число постов в одном запросе к /api/v1/posts/bulk/
+# и id в фильтре ?ids=
+API_BULK_MAX_POSTS = 500
+
+API_EXPORT_CHUNK_SIZE = 500
+
+# Счётчики ограничений API: файл SQLite, общий для процессов сервера
+THROTTLE_DATABASE = os.environ.get(
+    'THROTTLE_DATABASE', os.path.join(BASE_DIR, 'throttle.sqlite3')
+)
+
+THROTTLE_PRUNE_PROBABILITY = 0.001
+
+# Кэш токенов API в памяти процесса: число записей и время жизни
+AUTH_TOKEN_CACHE_SIZE = 10000
+
+AUTH_TOKEN_CACHE_TIMEOUT = 60
+
+AUTH_TOKEN_CACHE_LOG_EVERY = 1000
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
 
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.UserRateThrottle',
-        'rest_framework.throttling.AnonRateThrottle',
+        'api.throttling.UserRateThrottle',
+        'api.throttling.AnonRateThrottle',
+        'api.throttling.UserWriteRateThrottle',
+        'api.throttling.AnonWriteRateThrottle',
     ],
 
     'DEFAULT_THROTTLE_RATES': {
         'user': '10000/day',
         'anon': '1000/day',
+        'user_write': '1000/day',
+        'anon_write': '100/hour',
     }
 }